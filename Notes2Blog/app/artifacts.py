@@ -0,0 +1,117 @@
+from __future__ import annotations
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .config import settings
+
+
+class ArtifactStore:
+    """Generated articles, one directory per job under OUTPUT_DIR/article/<job_id>.
+
+    A job's files are written into a hidden staging directory that is renamed into place
+    once complete, so readers never see a half-written article and concurrent jobs never
+    share paths. Old job directories are pruned by age and count, at startup and then by
+    a save at most once per cleanup_interval seconds.
+    """
+
+    def __init__(self, root: str = None, retention_days: float = None, max_jobs: int = None, cleanup_interval: float = None):
+        self.root = Path(root or Path(settings.OUTPUT_DIR) / "article")
+        self.retention_days = retention_days if retention_days is not None else settings.ARTIFACT_RETENTION_DAYS
+        self.max_jobs = max_jobs if max_jobs is not None else settings.ARTIFACT_MAX_JOBS
+        self.cleanup_interval = cleanup_interval if cleanup_interval is not None else settings.ARTIFACT_CLEANUP_INTERVAL
+        self._lock = threading.Lock()
+        self._cleanup_lock = threading.Lock()
+        self._last_cleanup: Optional[float] = None
+
+    @staticmethod
+    def _check_id(job_id: str) -> str:
+        if not job_id or job_id.startswith(".") or "/" in job_id or "\\" in job_id:
+            raise ValueError(f"Invalid artifact id: {job_id!r}")
+        return job_id
+
+    def path(self, job_id: str) -> Path:
+        return self.root / self._check_id(job_id)
+
+    def save(self, job_id: str, files: Dict[str, str]) -> Path:
+        """Write all files for a job and publish them in a single rename."""
+        target = self.path(job_id)
+        staging = self.root / f".{job_id}.{uuid.uuid4().hex}.tmp"
+        staging.mkdir(parents=True)
+        try:
+            for name, content in files.items():
+                with open(staging / name, "w", encoding="utf-8") as f:
+                    f.write(content)
+            with self._lock:
+                if target.exists():
+                    # A rerun of the same job replaces the previous output as a whole
+                    stale = self.root / f".{job_id}.{uuid.uuid4().hex}.old"
+                    os.replace(target, stale)
+                    shutil.rmtree(stale, ignore_errors=True)
+                os.replace(staging, target)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        if self._cleanup_due():
+            # A prune scans the catalog and every job directory, so it runs in the background
+            threading.Thread(target=self.cleanup, name="artifact-cleanup", daemon=True).start()
+        return target
+
+    def _cleanup_due(self) -> bool:
+        """Whether a save should prune now; claims the slot so concurrent saves start only one prune."""
+        with self._cleanup_lock:
+            now = time.monotonic()
+            if self._last_cleanup is not None and now - self._last_cleanup < self.cleanup_interval:
+                return False
+            self._last_cleanup = now
+            return True
+
+    def files(self, job_id: str) -> List[str]:
+        target = self.path(job_id)
+        return sorted(p.name for p in target.iterdir()) if target.is_dir() else []
+
+    def file(self, job_id: str, name: str) -> Optional[Path]:
+        if name not in self.files(job_id):
+            return None
+        return self.path(job_id) / name
+
+    def _job_dirs(self) -> List[Path]:
+        if not self.root.exists():
+            return []
+        return [p for p in self.root.iterdir() if p.is_dir() and not p.name.startswith(".")]
+
+    def cleanup(self) -> int:
+        """Remove unpublished job directories older than the retention period, then the oldest beyond
+        max_jobs. Directories of posts in the catalog are kept for as long as the post is listed."""
+        from .catalog import catalog
+
+        with self._cleanup_lock:
+            self._last_cleanup = time.monotonic()
+        removed = []
+        published = catalog.job_ids()
+        with self._lock:
+            dirs = sorted((p for p in self._job_dirs() if p.name not in published), key=lambda p: p.stat().st_mtime)
+            cutoff = time.time() - self.retention_days * 86400
+            for index, path in enumerate(dirs):
+                too_old = self.retention_days > 0 and path.stat().st_mtime < cutoff
+                too_many = self.max_jobs > 0 and len(dirs) - index > self.max_jobs
+                if not (too_old or too_many):
+                    break
+                shutil.rmtree(path, ignore_errors=True)
+                removed.append(path.name)
+            # Staging directories left behind by a worker that died mid-write
+            for path in self.root.glob(".*.tmp") if self.root.exists() else []:
+                if path.stat().st_mtime < time.time() - 3600:
+                    shutil.rmtree(path, ignore_errors=True)
+        if settings.CHECKPOINT_ENABLED:
+            # Checkpoints go with their articles, and also age out for jobs that never saved one
+            from .checkpoints import checkpointer
+            checkpointer.delete_threads(removed)
+            checkpointer.cleanup(self.retention_days)
+        return len(removed)
+
+
+artifacts = ArtifactStore()
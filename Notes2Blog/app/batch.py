@@ -0,0 +1,78 @@
+from __future__ import annotations
+import asyncio
+from typing import Any, AsyncIterator, Dict, List
+
+from .config import settings
+from .jobs import Job, JobManager, JobQueueFull
+from .state import State
+
+
+BATCH_MODES = ("merge", "per_page")
+
+
+def _ocr_page(image_path: str, use_cache: bool):
+    # Imported lazily so importing the API does not load the pipeline
+    from .graph import transcribe_upload
+
+    return transcribe_upload(image_path, use_cache = use_cache)
+
+
+async def run_batch(image_paths: List[str], mode: str, jobs: JobManager, no_cache: bool = False) -> AsyncIterator[Dict[str, Any]]:
+    """OCR many pages concurrently and turn them into articles, yielding progress events as they happen.
+
+    In "merge" mode the pages are joined in the given order into one raw_text and processed as a
+    single article; in "per_page" mode every page becomes its own job as soon as its OCR is done.
+    At most BATCH_OCR_CONCURRENCY pages are transcribed at the same time.
+    """
+    semaphore = asyncio.Semaphore(settings.BATCH_OCR_CONCURRENCY)
+
+    async def ocr(index: int, image_path: str):
+        async with semaphore:
+            try:
+                text, cached = await asyncio.to_thread(_ocr_page, image_path, not no_cache)
+                return index, image_path, text, cached, None
+            except Exception as e:
+                return index, image_path, "", False, str(e)
+
+    def submit(state: State) -> Job:
+        return jobs.submit({**state, "logs": [], "no_cache": no_cache})
+
+    pages: Dict[int, str] = {}
+    pending = set()
+    for next_page in asyncio.as_completed([ocr(i, path) for i, path in enumerate(image_paths)]):
+        index, image_path, text, cached, error = await next_page
+        yield {"event": "page", "index": index, "image_path": image_path, "characters": len(text), "cached": cached, "error": error}
+        if error is not None or not text.strip():
+            continue
+        pages[index] = text
+        if mode == "per_page":
+            try:
+                job = submit({"image_path": image_path, "raw_text": text})
+            except JobQueueFull as e:
+                yield {"event": "job", "index": index, "status": "rejected", "error": str(e)}
+                continue
+            yield {"event": "job_queued", "index": index, "job_id": job.id}
+            pending.add(asyncio.ensure_future(_tagged(jobs, job, index)))
+
+    if mode == "merge":
+        if not pages:
+            yield {"event": "done", "error": "No text could be read from any page"}
+            return
+        raw_text = "\n\n".join(pages[i] for i in sorted(pages))
+        try:
+            job = submit({"image_path": image_paths[0], "raw_text": raw_text})
+        except JobQueueFull as e:
+            yield {"event": "done", "error": str(e)}
+            return
+        yield {"event": "job_queued", "pages": sorted(pages), "job_id": job.id}
+        pending.add(asyncio.ensure_future(_tagged(jobs, job, None)))
+
+    for finished in asyncio.as_completed(pending):
+        index, job = await finished
+        yield {"event": "job", "index": index, **job.to_dict()}
+    yield {"event": "done", "pages": len(image_paths), "transcribed": len(pages)}
+
+
+async def _tagged(jobs: JobManager, job: Job, index):
+    await jobs.wait(job)
+    return index, job
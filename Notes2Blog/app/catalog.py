@@ -0,0 +1,187 @@
+from __future__ import annotations
+import argparse
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from .config import settings
+from .markdown_utils import slugify
+
+
+def _normalize_tags(tags: Iterable[str]) -> List[str]:
+    seen = []
+    for tag in tags or []:
+        tag = str(tag).strip().lower()
+        if tag and tag not in seen:
+            seen.append(tag)
+    return seen
+
+
+class BlogCatalog:
+    """SQLite index of generated posts, backing GET /api/blogs.
+
+    One row per post plus a (tag, created_at) table, both indexed so slug lookups, listings
+    and tag filters are B-tree seeks. Listing uses keyset pagination (the cursor is the last
+    row's created_at and id), so page 500 costs the same as page 1. The article files stay
+    in the artifact store; the catalog only records where they are.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = Path(path or settings.CATALOG_PATH or Path(settings.OUTPUT_DIR) / "catalog.sqlite3")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA foreign_keys=ON")  # Deleting a post drops its tag rows
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS posts (
+                    id INTEGER PRIMARY KEY,
+                    slug TEXT NOT NULL UNIQUE,
+                    job_id TEXT NOT NULL UNIQUE,
+                    title TEXT NOT NULL,
+                    summary TEXT NOT NULL,
+                    tags TEXT NOT NULL,
+                    reading_time INTEGER NOT NULL,
+                    created_at TEXT NOT NULL,
+                    artifact_dir TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS posts_created ON posts (created_at, id);
+                CREATE TABLE IF NOT EXISTS post_tags (
+                    tag TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    post_id INTEGER NOT NULL REFERENCES posts (id) ON DELETE CASCADE,
+                    PRIMARY KEY (tag, created_at, post_id)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS post_tags_post ON post_tags (post_id);
+                """
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _unique_slug(self, db: sqlite3.Connection, slug: str, job_id: str) -> str:
+        # Another post already owns the slug: append -2, -3, ... until it is free
+        candidate, n = slug, 1
+        while True:
+            row = db.execute("SELECT job_id FROM posts WHERE slug = ?", (candidate,)).fetchone()
+            if row is None or row["job_id"] == job_id:
+                return candidate
+            n += 1
+            candidate = f"{slug}-{n}"
+
+    def add(self, job_id: str, metadata: Dict[str, Any], artifact_dir: str) -> str:
+        """Insert or replace the post for a job. Returns the slug it is stored under."""
+        tags = _normalize_tags(metadata.get("tags", []))
+        created_at = metadata.get("created_at") or datetime.now().isoformat()
+        with self._lock:
+            db = self._db()
+            slug = slugify(metadata.get("slug", "")) or slugify(metadata.get("title", "")) or job_id
+            slug = self._unique_slug(db, slug, job_id)
+            db.execute("DELETE FROM posts WHERE job_id = ?", (job_id,))
+            cursor = db.execute(
+                "INSERT INTO posts (slug, job_id, title, summary, tags, reading_time, created_at, artifact_dir) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    slug,
+                    job_id,
+                    metadata.get("title", ""),
+                    metadata.get("summary", ""),
+                    json.dumps(tags),
+                    int(metadata.get("reading_time") or 0),
+                    created_at,
+                    artifact_dir,
+                ),
+            )
+            db.executemany(
+                "INSERT OR IGNORE INTO post_tags (tag, created_at, post_id) VALUES (?, ?, ?)",
+                [(tag, created_at, cursor.lastrowid) for tag in tags],
+            )
+            db.commit()
+        return slug
+
+    def job_ids(self) -> Set[str]:
+        """Jobs with a published post; their artifact directories are never pruned."""
+        with self._lock:
+            return {row[0] for row in self._db().execute("SELECT job_id FROM posts")}
+
+    @staticmethod
+    def _row(row: sqlite3.Row) -> Dict[str, Any]:
+        post = dict(row)
+        post["tags"] = json.loads(post["tags"])
+        return post
+
+    def get(self, slug: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db().execute("SELECT * FROM posts WHERE slug = ?", (slug,)).fetchone()
+        return self._row(row) if row is not None else None
+
+    def list_posts(self, limit: int = 20, cursor: Optional[str] = None, tag: Optional[str] = None) -> Dict[str, Any]:
+        """Newest posts first. Pass the returned next_cursor to get the following page."""
+        limit = max(1, min(limit, settings.CATALOG_MAX_PAGE_SIZE))
+        if tag:
+            query = "SELECT p.* FROM post_tags t JOIN posts p ON p.id = t.post_id WHERE t.tag = ?"
+            params: List[Any] = [tag.strip().lower()]
+            keyset, order = "(t.created_at, t.post_id) < (?, ?)", "t.created_at DESC, t.post_id DESC"
+        else:
+            query, params = "SELECT * FROM posts WHERE 1", []
+            keyset, order = "(created_at, id) < (?, ?)", "created_at DESC, id DESC"
+        if cursor:
+            created_at, _, post_id = cursor.rpartition("|")
+            query += f" AND {keyset}"
+            params += [created_at, int(post_id)]
+        query += f" ORDER BY {order} LIMIT ?"
+        with self._lock:
+            rows = self._db().execute(query, (*params, limit + 1)).fetchall()
+        posts = [self._row(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = f"{posts[-1]['created_at']}|{posts[-1]['id']}"
+        return {"posts": posts, "next_cursor": next_cursor}
+
+    def rebuild(self, root: str = None) -> int:
+        """Re-index every article directory in the artifact store from its metadata.json."""
+        root = Path(root or Path(settings.OUTPUT_DIR) / "article")
+        with self._lock:
+            db = self._db()
+            db.execute("DELETE FROM posts")
+            db.commit()
+        entries = []
+        for metadata_path in root.glob("*/metadata.json"):
+            if metadata_path.parent.name.startswith("."):
+                continue
+            try:
+                metadata = json.loads(metadata_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Skipping {metadata_path}: {e}")
+                continue
+            entries.append((metadata.get("created_at", ""), metadata_path.parent, metadata))
+        # Oldest first, so clashing slugs get the same -2, -3 suffixes they had originally
+        for _, article_dir, metadata in sorted(entries, key=lambda entry: entry[0]):
+            self.add(metadata.get("job_id") or article_dir.name, metadata, str(article_dir))
+        return len(entries)
+
+
+catalog = BlogCatalog()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage the blog catalog index.")
+    parser.add_argument("--rebuild", action="store_true", help="Re-index every article under OUTPUT_DIR/article")
+    args = parser.parse_args()
+    if args.rebuild:
+        count = catalog.rebuild()
+        print(f"📚 Indexed {count} posts into {catalog.path}")
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+from __future__ import annotations
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+from langgraph.checkpoint.base import WRITES_IDX_MAP, BaseCheckpointSaver, ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple, get_checkpoint_id, get_checkpoint_metadata
+from langchain_core.runnables import RunnableConfig
+
+from .config import settings
+
+
+class SQLiteCheckpointer(BaseCheckpointSaver):
+    """LangGraph checkpointer that keeps each job's latest graph state in SQLite.
+
+    The graph runs with the job id as its thread id, so a finished (or failed) job can be
+    resumed later from any node with OCR text, theme, outline and blog markdown taken from
+    the checkpoint instead of being recomputed. Only the newest checkpoint per job is kept,
+    since resuming never needs older ones. Works across worker processes (WAL mode).
+    """
+
+    def __init__(self, path: str = None):
+        super().__init__()
+        self.path = Path(path or settings.CHECKPOINT_PATH or Path(settings.OUTPUT_DIR) / "checkpoints.sqlite3")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    thread_id TEXT NOT NULL,
+                    checkpoint_ns TEXT NOT NULL,
+                    checkpoint_id TEXT NOT NULL,
+                    parent_id TEXT,
+                    type TEXT NOT NULL,
+                    checkpoint BLOB NOT NULL,
+                    metadata_type TEXT NOT NULL,
+                    metadata BLOB NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (thread_id, checkpoint_ns)
+                );
+                CREATE INDEX IF NOT EXISTS checkpoints_updated ON checkpoints (updated_at);
+                CREATE TABLE IF NOT EXISTS writes (
+                    thread_id TEXT NOT NULL,
+                    checkpoint_ns TEXT NOT NULL,
+                    checkpoint_id TEXT NOT NULL,
+                    task_id TEXT NOT NULL,
+                    idx INTEGER NOT NULL,
+                    channel TEXT NOT NULL,
+                    type TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    task_path TEXT NOT NULL,
+                    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+                );
+                """
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _config(thread_id: str, checkpoint_ns: str, checkpoint_id: Optional[str]) -> Optional[RunnableConfig]:
+        if checkpoint_id is None:
+            return None
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}}
+
+    def _tuple(self, db: sqlite3.Connection, row: Tuple) -> CheckpointTuple:
+        thread_id, checkpoint_ns, checkpoint_id, parent_id, kind, blob, metadata_kind, metadata = row
+        writes = db.execute(
+            "SELECT task_id, channel, type, value FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return CheckpointTuple(
+            config=self._config(thread_id, checkpoint_ns, checkpoint_id),
+            checkpoint=self.serde.loads_typed((kind, blob)),
+            metadata=self.serde.loads_typed((metadata_kind, metadata)),
+            parent_config=self._config(thread_id, checkpoint_ns, parent_id),
+            pending_writes=[(task_id, channel, self.serde.loads_typed((value_kind, value))) for task_id, channel, value_kind, value in writes],
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        query = "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_id, type, checkpoint, metadata_type, metadata FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?"
+        params: list = [thread_id, checkpoint_ns]
+        if checkpoint_id := get_checkpoint_id(config):
+            query += " AND checkpoint_id = ?"
+            params.append(checkpoint_id)
+        with self._lock:
+            db = self._db()
+            row = db.execute(query, params).fetchone()
+            return self._tuple(db, row) if row is not None else None
+
+    def list(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None, before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> Iterator[CheckpointTuple]:
+        query = "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_id, type, checkpoint, metadata_type, metadata FROM checkpoints WHERE 1"
+        params: list = []
+        if config is not None:
+            query += " AND thread_id = ?"
+            params.append(config["configurable"]["thread_id"])
+            if "checkpoint_ns" in config["configurable"]:
+                query += " AND checkpoint_ns = ?"
+                params.append(config["configurable"]["checkpoint_ns"])
+            if checkpoint_id := get_checkpoint_id(config):
+                query += " AND checkpoint_id = ?"
+                params.append(checkpoint_id)
+        if before is not None and (before_id := get_checkpoint_id(before)):
+            query += " AND checkpoint_id < ?"
+            params.append(before_id)
+        with self._lock:
+            db = self._db()
+            tuples = [self._tuple(db, row) for row in db.execute(query + " ORDER BY checkpoint_id DESC", params).fetchall()]
+        for item in tuples:
+            if filter and any(item.metadata.get(key) != value for key, value in filter.items()):
+                continue
+            if limit is not None:
+                if limit <= 0:
+                    break
+                limit -= 1
+            yield item
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata, new_versions: ChannelVersions) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        kind, blob = self.serde.dumps_typed(checkpoint)
+        metadata_kind, metadata_blob = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        with self._lock:
+            db = self._db()
+            # Replace the job's previous checkpoint; its pending writes are folded into this one
+            db.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"), kind, blob, metadata_kind, metadata_blob, time.time()),
+            )
+            db.execute("DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id != ?", (thread_id, checkpoint_ns, checkpoint["id"]))
+            db.commit()
+        return self._config(thread_id, checkpoint_ns, checkpoint["id"])
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str, task_path: str = "") -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            kind, blob = self.serde.dumps_typed(value)
+            rows.append((thread_id, checkpoint_ns, checkpoint_id, task_id, WRITES_IDX_MAP.get(channel, idx), channel, kind, blob, task_path))
+        with self._lock:
+            db = self._db()
+            # Special writes (errors, interrupts; negative idx) replace earlier ones, regular writes are kept once
+            db.executemany("INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", [row for row in rows if row[4] < 0])
+            db.executemany("INSERT OR IGNORE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", [row for row in rows if row[4] >= 0])
+            db.commit()
+
+    def delete_thread(self, thread_id: str) -> None:
+        self.delete_threads([thread_id])
+
+    def delete_threads(self, thread_ids: Iterable[str]) -> None:
+        thread_ids = [(thread_id,) for thread_id in thread_ids]
+        if not thread_ids:
+            return
+        with self._lock:
+            db = self._db()
+            db.executemany("DELETE FROM checkpoints WHERE thread_id = ?", thread_ids)
+            db.executemany("DELETE FROM writes WHERE thread_id = ?", thread_ids)
+            db.commit()
+
+    def has_thread(self, thread_id: str) -> bool:
+        with self._lock:
+            return self._db().execute("SELECT 1 FROM checkpoints WHERE thread_id = ? LIMIT 1", (thread_id,)).fetchone() is not None
+
+    def cleanup(self, retention_days: float) -> int:
+        """Drop checkpoints of jobs not run for longer than retention_days (0 keeps them forever)."""
+        if retention_days <= 0:
+            return 0
+        cutoff = time.time() - retention_days * 86400
+        with self._lock:
+            db = self._db()
+            stale = [row[0] for row in db.execute("SELECT DISTINCT thread_id FROM checkpoints WHERE updated_at < ?", (cutoff,))]
+        self.delete_threads(stale)
+        return len(stale)
+
+
+checkpointer = SQLiteCheckpointer()
@@ -11,23 +11,111 @@ class Settings(BaseSettings):
 
     UPLOAD_DIR: str = "./uploads"
     OUTPUT_DIR: str = "./outputs"
+    MAX_FILE_SIZE: int = 25 * 1024 * 1024  # Largest accepted upload; bigger ones get a 413
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # Uploads are streamed to disk this many bytes at a time
 
     USE_OPENAI_VISION: bool = True
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
     OPENAI_VISION_MODEL: str = "gpt-4o-mini"
     OPENAI_TEXT_MODEL: str = "gpt-4o-mini"
 
+    # Shared OpenAI client pool (used by OCR and every DSPy stage)
+    OPENAI_BASE_URL: Optional[str] = None  # e.g. a local fake server for tests and load tests
+    OPENAI_MAX_CONNECTIONS: int = 20  # Keep-alive connection pool size
+    OPENAI_MAX_CONCURRENCY: int = 16  # Requests in flight at once; the rest wait in line
+    OPENAI_REQUESTS_PER_MINUTE: int = 500
+    OPENAI_TOKENS_PER_MINUTE: int = 200000
+    OPENAI_MAX_RETRIES: int = 5  # For 429s and transient connection/server errors
+    OPENAI_TIMEOUT: float = 120.0
+
+    # Notes up to this many characters get theme, outline and blog from one LM call instead of two (0 disables)
+    FUSED_BLOG_MAX_CHARS: int = 3000
+
     REQUIRE_H1: bool = True
     REQUIRE_SECTIONS: bool = True
+    # "local" computes all metadata from the markdown (title from the H1, lead-paragraph summary, keyword
+    # tags); "polish" adds a small LM call for title and summary; "lm" also asks the LM for tags
+    METADATA_MODE: str = "local"
+    METADATA_MAX_TAGS: int = 5
+    METADATA_LEAD_CHARS: int = 800  # Opening text shown to the LM in polish mode
+    READING_WORDS_PER_MINUTE: int = 200
+
+    REACT_MODE: str = "template"  # "template" renders the React page in-process; "creative" generates it with the LM
+    REACT_CHECK_SYNTAX: bool = True  # Parse generated JSX locally and send syntax errors back to the LM
+    REACT_REQUIRED_COLORS: dict = {"ACCENT_RED": "#dc2626", "BG_OFFWHITE": "#fffcf8"}  # Constants the component must define
+    # "patch" sends only the failing lines to the LM and applies its search/replace hunks locally
+    # (falling back to "full" if they do not apply); "full" regenerates the whole component
+    REACT_REPAIR_MODE: str = "patch"
+    REACT_REPAIR_CONTEXT_LINES: int = 6  # Lines shown around each failing line
     
     # Image compression settings to reduce token usage
     MAX_IMAGE_SIZE: tuple = (1024, 1024)  # Max width/height in pixels
     IMAGE_QUALITY: int = 85  # JPEG quality (1-95, lower = smaller file)
     
+    # "page" OCRs the compressed page in one call. "tiled" splits large pages into text strips
+    # and OCRs them concurrently at full resolution (better on small handwriting)
+    OCR_MODE: str = "page"
+    OCR_TILE_MIN_PIXELS: int = 4_000_000  # Smaller pages are always read whole
+    OCR_TILE_MAX_REGIONS: int = 12  # Strips per page (one OCR call each)
+
+    # Hybrid OCR: Tesseract reads the page first and only low-confidence lines are sent to vision
+    OCR_HYBRID: bool = False
+    OCR_HYBRID_MIN_CONFIDENCE: float = 60.0  # Tesseract word confidence (0-100) a line must average
+    OCR_HYBRID_MAX_WEAK_FRACTION: float = 0.6  # Above this share of weak lines, send the whole page instead
+    OCR_HYBRID_MAX_REGIONS: int = 8  # Likewise when the weak lines are scattered over more crops than this
+
+    # Local Tesseract OCR (when vision is off) runs in a pool of worker processes
+    OCR_WORKERS: int = 0  # 0 = one per CPU core
+    OCR_MAX_PENDING: int = 64  # Images queued or running in the pool at once
+    OCR_QUEUE_TIMEOUT: float = 60.0  # Seconds to wait for a slot before giving up
+
     # DSPy optimization settings
     LM_TEMPERATURE: float = 0.1  # Lower temperature for more consistent outputs
     MAX_TOKENS: int = 2000  # Limit output length
 
+    # Compiled ReactCode program, built offline with `python -m app.modules.react_program`
+    REACT_PROGRAM_PATH: str = "./artifacts/react_program.json"
+
+    # OCR result cache (in-memory LRU + files under OUTPUT_DIR/cache/ocr)
+    OCR_CACHE_ENABLED: bool = True
+    OCR_CACHE_MEMORY_ITEMS: int = 256  # Entries kept in the in-memory LRU tier
+    OCR_CACHE_DISK_MAX_BYTES: int = 50 * 1024 * 1024  # Size cap for the on-disk tier
+    OCR_CACHE_TTL_SECONDS: int = 7 * 24 * 3600  # Entries older than this are ignored (0 = never expire)
+
+    # LM call cache for the DSPy stages (SQLite, least-recently-used eviction)
+    LM_CACHE_ENABLED: bool = True
+    LM_CACHE_PATH: str = ""  # Defaults to OUTPUT_DIR/cache/lm_cache.sqlite3
+    LM_CACHE_MAX_ENTRIES: int = 10000
+    LM_CACHE_MAX_BYTES: int = 200 * 1024 * 1024
+
+    # Build the LM, OCR client, React program and graph in the background at startup (GET /ready
+    # answers 503 until done). When off, everything is built lazily by the first request.
+    WARMUP_ON_STARTUP: bool = True
+
+    # Generated articles, one directory per job under OUTPUT_DIR/article
+    # Pruning only applies to unpublished job directories; posts in the catalog keep theirs
+    ARTIFACT_RETENTION_DAYS: float = 30  # 0 keeps them forever
+    ARTIFACT_MAX_JOBS: int = 1000  # Oldest unpublished job directories are removed beyond this; 0 = no limit
+    ARTIFACT_CLEANUP_INTERVAL: float = 600  # Seconds between prunes triggered by saves (startup always prunes); 0 = every save
+
+    # Blog catalog (SQLite index behind GET /api/blogs); rebuild with `python -m app.catalog --rebuild`
+    CATALOG_PATH: str = ""  # Defaults to OUTPUT_DIR/catalog.sqlite3
+    CATALOG_MAX_PAGE_SIZE: int = 100
+
+    # Graph checkpoints (SQLite, latest state per job) so POST /jobs/{id}/resume can rerun from any node
+    CHECKPOINT_ENABLED: bool = True
+    CHECKPOINT_PATH: str = ""  # Defaults to OUTPUT_DIR/checkpoints.sqlite3; pruned with ARTIFACT_RETENTION_DAYS
+
+    # Background job settings for /process
+    JOB_EXECUTOR: str = "thread"  # "thread" or "process"
+    JOB_WORKERS: int = 4  # Workflows that run at the same time
+    JOB_MAX_PENDING: int = 64  # Queued + running jobs before /process answers 503
+    JOB_HISTORY_LIMIT: int = 1000  # Finished jobs kept in memory for GET /jobs/{id}
+
+    # POST /process/batch
+    BATCH_OCR_CONCURRENCY: int = 8  # Pages transcribed at the same time
+    BATCH_MAX_IMAGES: int = 200
+
     class Config:
         env_file = ".env"
 
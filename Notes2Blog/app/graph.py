@@ -1,132 +1,244 @@
 from __future__ import annotations
 import dspy
 import json
+import uuid
 from datetime import datetime
+from langgraph.config import get_stream_writer
 from langgraph.graph import END, StateGraph, START
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 
-from .modules.pipeline import image_to_text, theme_and_outline, generate_blog, generate_react_code, improve_from_feedback, ReactCode, generate_metadata
-from .storage import as_base64, save_output
+from .modules.pipeline import image_to_text, theme_and_outline, theme_outline_and_blog, generate_blog, generate_react_code, improve_from_feedback, repair_react_code, generate_metadata, polish_metadata
+from .modules.metadata import local_metadata
+from .modules.react_template import render_react
+from .modules.react_program import get_react_program
+from .storage import image_pixels, prepare_image, read_upload
+from .artifacts import artifacts
+from .catalog import catalog
+from .ocr_cache import ocr_cache
 from .validators import validate_blog_markdown, validate_react
-from .state import State
+from .state import RESUME_NODES, State
 from .config import settings
+from .metrics import instrument, record
 
-def add_logs(state: State, message: str) -> State:
-    logs = list(state.get("logs", []))
-    logs.append(message)
-    state["logs"] = logs
-    return state
+def add_logs(update: State, message: str) -> State:
+    # Nodes return partial updates; the logs reducer in State appends them to the run's log
+    update.setdefault("logs", []).append(message)
+    return update
+
+def transcribe(image: bytes, use_cache: bool = True, tiled: bool = False) -> Tuple[str, bool]:
+    """OCR one image, going through the OCR cache. Returns the text and whether it was a cache hit."""
+    backend = image_to_text.ocr_tool.backend + ("+tiled" if tiled else "")
+    cache_key = ocr_cache.key(image, backend)
+    if settings.OCR_CACHE_ENABLED and use_cache:
+        cached = ocr_cache.get(cache_key)
+        if cached is not None:
+            record("ocr_cache_hits")
+            return cached, True
+    pred = image_to_text(image = image, tiled = tiled)
+    raw_text = pred.raw_text or ""
+    # Only cache real transcriptions, never empty output or backend error messages
+    if settings.OCR_CACHE_ENABLED and raw_text.strip() and not raw_text.startswith("Vision Error"):
+        ocr_cache.put(cache_key, raw_text, backend = backend)
+    return raw_text, False
+
+def transcribe_upload(image_path: str, use_cache: bool = True) -> Tuple[str, bool]:
+    """OCR an uploaded page. With OCR_MODE=tiled, large pages are split into strips and read at
+    full resolution; everything else is read from the compressed copy."""
+    if settings.OCR_MODE == "tiled" and image_pixels(image_path) >= settings.OCR_TILE_MIN_PIXELS:
+        return transcribe(read_upload(image_path), use_cache, tiled = True)
+    return transcribe(prepare_image(image_path), use_cache)
 
 def ocr_node(state: State) -> State:
-    state = add_logs(state, "Converting image to raw text with OCR")
-    if not state.get("image_b64") and state.get("image_path"):
-        state["image_b64"] = as_base64(state["image_path"])
-    pred = image_to_text(image_64 = state.get("image_b64", ""))
-    state["raw_text"] = pred.raw_text or ""
-    return add_logs(state, f"OCR completed: {len(state['raw_text'])} characters")
+    update = add_logs({}, "Converting image to raw text with OCR")
+    use_cache = not state.get("no_cache")
+    if state.get("image_bytes"):
+        update["raw_text"], cached = transcribe(state["image_bytes"], use_cache)
+    elif state.get("image_path"):
+        update["raw_text"], cached = transcribe_upload(state["image_path"], use_cache)
+    else:
+        update["raw_text"], cached = transcribe(b"", use_cache)
+    if cached:
+        return add_logs(update, f"OCR cache hit ({image_to_text.ocr_tool.backend}): {len(update['raw_text'])} characters")
+    return add_logs(update, f"OCR completed: {len(update['raw_text'])} characters")
 
 def reason_node(state: State) -> State:
-    state = add_logs(state, "Reasoning and figuring out the theme and outline")
+    update = add_logs({}, "Reasoning and figuring out the theme and outline")
     pred = theme_and_outline(raw_text = state.get("raw_text", ""))
-    state["theme"] = pred.theme or ""
-    state["outline"] = pred.outline or []
-    return add_logs(state, f"Reasoning completed, theme: {state['theme']}, outline: {state['outline']}")
+    update["theme"] = pred.theme or ""
+    update["outline"] = pred.outline or []
+    return add_logs(update, f"Reasoning completed, theme: {update['theme']}, outline: {update['outline']}")
+
+def blog_token_writer(state: State):
+    if not state.get("stream_tokens"):
+        return None
+    writer = get_stream_writer()
+    return lambda chunk: writer({"event": "token", "field": "blog_markdown", "chunk": chunk})
+
+def theme_outline_and_blog_node(state: State) -> State:
+    # Short notes: theme, outline and blog from a single LM call (see FUSED_BLOG_MAX_CHARS)
+    update = add_logs({}, "Finding the theme and outline and writing the blog post in one pass")
+    pred = theme_outline_and_blog(raw_text = state.get("raw_text", ""), on_token = blog_token_writer(state))
+    update["theme"] = pred.theme or ""
+    update["outline"] = pred.outline or []
+    update["blog_markdown"] = pred.blog_markdown or ""
+    add_logs(update, f"Reasoning completed, theme: {update['theme']}, outline: {update['outline']}")
+    validity, feedback = validate_blog_markdown(update["blog_markdown"])
+    update["validated"] = validity
+    if not validity:
+        update["feedback"] = feedback
+        return add_logs(update, f"Blog markdown is invalid: {feedback}")
+    return add_logs(update, f"Blog markdown is valid")
 
 def generate_blog_node(state: State) -> State:
-    state = add_logs(state, "Generating blog post in markdown format")
-    pred = generate_blog(raw_text = state.get("raw_text", ""), theme = state.get("theme", ""), outline = state.get("outline", []))
-    state["blog_markdown"] = pred.blog_markdown or ""
-    validity, feedback = validate_blog_markdown(state["blog_markdown"])
-    state["validated"] = validity
+    update = add_logs({}, "Generating blog post in markdown format")
+    pred = generate_blog(raw_text = state.get("raw_text", ""), theme = state.get("theme", ""), outline = state.get("outline", []), on_token = blog_token_writer(state))
+    update["blog_markdown"] = pred.blog_markdown or ""
+    validity, feedback = validate_blog_markdown(update["blog_markdown"])
+    update["validated"] = validity
     if not validity:
-        state["feedback"] = feedback
-        return add_logs(state, f"Blog markdown is invalid: {feedback}")
-    return add_logs(state, f"Blog markdown is valid")
+        update["feedback"] = feedback
+        return add_logs(update, f"Blog markdown is invalid: {feedback}")
+    return add_logs(update, f"Blog markdown is valid")
 
 def generate_metadata_node(state: State) -> State:
-    state = add_logs(state, "Generating blog metadata")
-    pred = generate_metadata(blog_markdown = state.get("blog_markdown", ""), theme = state.get("theme", ""))
-    state["title"] = pred.title or state.get("theme", "Untitled")
-    state["summary"] = pred.summary or ""
-    state["tags"] = pred.tags or []
-    state["slug"] = pred.slug or ""
-    state["reading_time"] = pred.reading_time or 5
-    return add_logs(state, f"Metadata generated: {state['title']}")
+    update = add_logs({}, "Generating blog metadata")
+    # Slug, reading time, counts and (outside "lm" mode) tags always come from the markdown, so they are
+    # the same on every run; the LM can only reword the title and summary
+    local = local_metadata(state.get("blog_markdown", ""), state.get("theme", ""))
+    for key in ("title", "summary", "tags", "slug", "reading_time", "word_count", "section_count"):
+        update[key] = local[key]
+    if settings.METADATA_MODE == "polish":
+        pred = polish_metadata(draft_title = local["title"], headings = local["headings"], lead = local["lead"])
+        update["title"] = pred.title or local["title"]
+        update["summary"] = pred.summary or local["summary"]
+    elif settings.METADATA_MODE == "lm":
+        pred = generate_metadata(blog_markdown = state.get("blog_markdown", ""), theme = state.get("theme", ""))
+        update["title"] = pred.title or local["title"]
+        update["summary"] = pred.summary or local["summary"]
+        update["tags"] = pred.tags or local["tags"]
+    return add_logs(update, f"Metadata generated ({settings.METADATA_MODE}): {update['title']}, {update['word_count']} words, {update['reading_time']} min read")
 
 def generate_react_node(state: State) -> State:
-    state = add_logs(state, "Generating react code from blog markdown")
-    pred = ReactCode(blog_markdown = state.get("blog_markdown", ""))
-    state["react_code"] = pred.react_code or ""
-    validity, feedback = validate_react(state["react_code"])
-    state["validated"] = validity
+    if (state.get("react_mode") or settings.REACT_MODE) == "template":
+        update = add_logs({}, "Rendering react code from blog markdown with the template")
+        update["react_code"] = render_react(state.get("blog_markdown", ""), title = state.get("theme", ""))
+    else:
+        update = add_logs({}, "Generating react code from blog markdown")
+        pred = get_react_program()(blog_markdown = state.get("blog_markdown", ""))
+        update["react_code"] = pred.react_code or ""
+    update["retry_count"] = state.get("retry_count", 0)  # Initialize retry count
+    validity, feedback = validate_react(update["react_code"])
+    update["validated"] = validity
+    if not validity:
+        update["feedback"] = feedback
+        return add_logs(update, f"React code is invalid: {feedback}")
+    return add_logs(update, f"React code is valid")
+
+def improve_from_feedback_node(state: State) -> State:
+    update = add_logs({}, "Improving from feedback")
+    retry_count = state.get("retry_count", 0) + 1
+    update["retry_count"] = retry_count
+    
+    if settings.REACT_REPAIR_MODE == "patch":
+        pred = repair_react_code(feedback = state.get("feedback", ""), react_code = state.get("react_code", ""))
+        if pred.patched:
+            add_logs(update, f"Applied {pred.hunks} patch hunk(s) to the React code")
+        else:
+            add_logs(update, f"Patch not usable ({pred.error}), regenerated the React code")
+    else:
+        pred = improve_from_feedback(feedback = state.get("feedback", ""), react_code = state.get("react_code", ""))
+    update["react_code"] = pred.improved_react_code or ""
+    validity, feedback = validate_react(update["react_code"])
+    update["validated"] = validity
     if not validity:
-        state["feedback"] = feedback
-        state["retry_count"] = state.get("retry_count", 0)  # Initialize retry count
-        return add_logs(state, f"React code is invalid: {feedback}")
-    save_output("Article.md", state["blog_markdown"], subdir = "article")
-    save_output("Article.tsx", state["react_code"], subdir = "article")
+        update["feedback"] = feedback
+        return add_logs(update, f"React revalidation failed (attempt {retry_count}): {feedback}")
+    return add_logs(update, f"React revalidation completed")
+
+def react_done_node(state: State) -> State:
+    if state.get("validated", False):
+        return add_logs({}, "React code is ready")
+    return add_logs({}, f"Giving up on React code after {state.get('retry_count', 0)} retries")
+
+def save_artifacts_node(state: State) -> State:
+    # Join point: runs once both the metadata and the React branch have finished
+    if not state.get("validated", False):
+        return add_logs({}, "Skipping save, React code did not validate")
     # Save metadata as JSON
     metadata = {
+        "job_id": state.get("job_id", ""),
         "title": state.get("title", ""),
         "summary": state.get("summary", ""),
         "tags": state.get("tags", []),
         "slug": state.get("slug", ""),
         "reading_time": state.get("reading_time", 5),
+        "word_count": state.get("word_count", 0),
+        "section_count": state.get("section_count", 0),
         "created_at": datetime.now().isoformat()
     }
-    save_output("metadata.json", json.dumps(metadata, indent=2), subdir = "article")
-    return add_logs(state, f"React code is valid")
+    # Each run gets its own directory, so concurrent jobs never overwrite each other
+    artifact_id = state.get("job_id") or uuid.uuid4().hex
+    path = artifacts.save(artifact_id, {
+        "Article.md": state.get("blog_markdown", ""),
+        "Article.tsx": state.get("react_code", ""),
+        "metadata.json": json.dumps(metadata, indent=2),
+    })
+    slug = catalog.add(artifact_id, metadata, str(path))
+    return add_logs({"artifact_dir": str(path), "slug": slug}, f"Artifacts saved to {path}, published as /api/blogs/{slug}")
 
-def improve_from_feedback_node(state: State) -> State:
-    state = add_logs(state, "Improving from feedback")
-    retry_count = state.get("retry_count", 0) + 1
-    state["retry_count"] = retry_count
-    
-    pred = improve_from_feedback(feedback = state.get("feedback", ""), react_code = state.get("react_code", ""))
-    state["react_code"] = pred.improved_react_code or ""
-    validity, feedback = validate_react(state["react_code"])
-    state["validated"] = validity
-    if not validity:
-        state["feedback"] = feedback
-        return add_logs(state, f"React revalidation failed (attempt {retry_count}): {feedback}")
-    save_output("Article.tsx", state["react_code"], subdir = "article")
-    return add_logs(state, f"React revalidation completed")
+def route_text(state: State) -> str:
+    # Short notes skip the separate reasoning call
+    if 0 < len(state.get("raw_text", "")) <= settings.FUSED_BLOG_MAX_CHARS:
+        return "theme_outline_and_blog"
+    return "reason"
+
+def route_start(state: State) -> str:
+    # Resumed jobs start at the requested node; callers that already have the text (e.g. merged notebook pages) skip OCR
+    node = state.get("resume_from") or ("reason" if state.get("raw_text") else "ocr")
+    return route_text(state) if node == "reason" else node
 
-def graph():
+def graph(checkpointer = None):
     graph = StateGraph(State)
-    graph.add_node("ocr", ocr_node)
-    graph.add_node("reason", reason_node)
-    graph.add_node("generate_blog", generate_blog_node)
-    graph.add_node("generate_metadata", generate_metadata_node)
-    graph.add_node("generate_react", generate_react_node)
-    graph.add_node("improve_from_feedback", improve_from_feedback_node)
-    graph.add_edge(START, "ocr")
-    graph.add_edge("ocr", "reason")
+    graph.add_node("ocr", instrument("ocr", ocr_node))
+    graph.add_node("reason", instrument("reason", reason_node))
+    graph.add_node("theme_outline_and_blog", instrument("theme_outline_and_blog", theme_outline_and_blog_node))
+    graph.add_node("generate_blog", instrument("generate_blog", generate_blog_node))
+    graph.add_node("generate_metadata", instrument("generate_metadata", generate_metadata_node))
+    graph.add_node("generate_react", instrument("generate_react", generate_react_node))
+    graph.add_node("improve_from_feedback", instrument("improve_from_feedback", improve_from_feedback_node))
+    graph.add_node("react_done", instrument("react_done", react_done_node))
+    # Deferred: runs once, after every other branch of the run has finished. A resumed run may
+    # only rerun one branch (e.g. React feedback), so a barrier on both branches would never fire
+    graph.add_node("save_artifacts", instrument("save_artifacts", save_artifacts_node), defer = True)
+    graph.add_conditional_edges(START, route_start, [*RESUME_NODES, "theme_outline_and_blog"])
+    graph.add_conditional_edges("ocr", route_text, ["reason", "theme_outline_and_blog"])
     graph.add_edge("reason", "generate_blog")
-    graph.add_edge("generate_blog", "generate_metadata")
-    graph.add_edge("generate_metadata", "generate_react")
+    # Metadata and React generation only need the blog markdown and theme, so they run concurrently
+    for node in ("generate_blog", "theme_outline_and_blog"):
+        graph.add_edge(node, "generate_metadata")
+        graph.add_edge(node, "generate_react")
     
     def should_end_or_retry(state: State) -> str:
         validated = state.get("validated", False)
         retry_count = state.get("retry_count", 0)
         
         if validated:
-            return "END"
+            return "react_done"
         elif retry_count >= 3:
-            return "END"  # Stop after 3 retries
+            return "react_done"  # Stop after 3 retries
         else:
             return "improve_from_feedback"
     
-    graph.add_conditional_edges(
-        "generate_react",
-        should_end_or_retry,
-        {
-            "END": END,
-            "improve_from_feedback": "improve_from_feedback",
-        }
-    )
-    graph.add_edge("improve_from_feedback", "generate_react")
-    return graph.compile()
-
-
-
+    for node in ("generate_react", "improve_from_feedback"):
+        graph.add_conditional_edges(
+            node,
+            should_end_or_retry,
+            {
+                "react_done": "react_done",
+                "improve_from_feedback": "improve_from_feedback",
+            }
+        )
+    graph.add_edge("generate_metadata", "save_artifacts")
+    graph.add_edge("react_done", "save_artifacts")
+    graph.add_edge("save_artifacts", END)
+    return graph.compile(checkpointer = checkpointer)
@@ -0,0 +1,291 @@
+from __future__ import annotations
+import asyncio
+import logging
+import multiprocessing
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import nullcontext
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from rich import print as rprint
+
+from . import metrics
+from .config import settings
+from .state import State
+
+
+_workflow = None
+_workflow_lock = threading.Lock()
+
+
+def get_workflow():
+    """Compile the LangGraph workflow on first use. Importing the graph pulls in DSPy and LangGraph,
+    so it is deferred until a job (or the startup warm-up) actually needs it."""
+    global _workflow
+    if _workflow is None:
+        with _workflow_lock:
+            if _workflow is None:
+                from .graph import graph
+                from .modules.lm import configure_lm
+                # DSPy modules snapshot dspy.settings when they are entered, so the LM has to be
+                # configured before the first node runs, not lazily inside a module call
+                configure_lm()
+                checkpointer = None
+                if settings.CHECKPOINT_ENABLED:
+                    from .checkpoints import checkpointer
+                _workflow = graph(checkpointer)
+    return _workflow
+
+
+class JobQueueFull(Exception):
+    """Raised when more jobs are pending than JOB_MAX_PENDING allows."""
+
+
+class JobNotFound(Exception):
+    """Raised when resuming a job that has no checkpoint."""
+
+
+class JobBusy(Exception):
+    """Raised when resuming a job that is still queued or running."""
+
+
+def build_result(final_state: State) -> Dict[str, Any]:
+    """Shape the final graph state into the /process response body."""
+    return {
+        "theme": final_state.get("theme"),
+        "outline": final_state.get("outline"),
+        "blog_markdown": final_state.get("blog_markdown"),
+        "react_code": final_state.get("react_code"),
+        "logs": final_state.get("logs", []),
+        "trace": final_state.get("trace", []),
+        "validated": final_state.get("validated", False),
+        "artifact_dir": final_state.get("artifact_dir"),
+        "metadata": {
+            "title": final_state.get("title", ""),
+            "summary": final_state.get("summary", ""),
+            "tags": final_state.get("tags", []),
+            "slug": final_state.get("slug", ""),
+            "reading_time": final_state.get("reading_time", 5),
+            "word_count": final_state.get("word_count", 0),
+            "section_count": final_state.get("section_count", 0),
+        },
+    }
+
+
+def _cache_scope(state: State):
+    from .modules.lm_cache import bypass_cache
+
+    return bypass_cache() if state.get("no_cache") else nullcontext()
+
+
+def _thread(state: State) -> Optional[Dict[str, Any]]:
+    """Run config that checkpoints the graph under the job id, or None when checkpoints are off."""
+    if not settings.CHECKPOINT_ENABLED:
+        return None
+    return {"configurable": {"thread_id": state.get("job_id") or uuid.uuid4().hex}}
+
+
+def _history(workflow, config: Optional[Dict[str, Any]]) -> Tuple[int, int]:
+    # A resumed job's checkpoint already holds the logs and trace of its earlier runs
+    if config is None:
+        return 0, 0
+    values = workflow.get_state(config).values
+    return len(values.get("logs", [])), len(values.get("trace", []))
+
+
+def _this_run(final_state: State, history: Tuple[int, int]) -> State:
+    """Final state with logs and trace cut down to the entries added by this run."""
+    logs, trace = history
+    return {**final_state, "logs": final_state.get("logs", [])[logs:], "trace": final_state.get("trace", [])[trace:]}
+
+
+def run_workflow(state: State) -> Dict[str, Any]:
+    """Run the LangGraph workflow to completion. Executed inside the worker pool."""
+    workflow, config = get_workflow(), _thread(state)
+    history = _history(workflow, config)
+    with _cache_scope(state):
+        final_state = _this_run(workflow.invoke({**state, "stream_tokens": False}, config), history)
+    rprint({"logs": final_state.get("logs", [])})
+    return build_result(final_state)
+
+
+def stream_workflow(state: State, emit: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
+    """Run the workflow with LangGraph streaming, passing progress events to emit as they happen.
+
+    Events are node_start / node_end per node, a log event per State.logs entry and the
+    token events that the blog-writing node writes to the custom stream.
+    """
+    final_state: State = state
+    workflow, config = get_workflow(), _thread(state)
+    history = _history(workflow, config)
+    with _cache_scope(state):
+        for mode, chunk in workflow.stream({**state, "stream_tokens": True}, config, stream_mode=["debug", "updates", "custom", "values"]):
+            if mode == "debug" and chunk.get("type") == "task":
+                emit({"event": "node_start", "node": chunk["payload"]["name"]})
+            elif mode == "updates":
+                for node, update in chunk.items():
+                    for message in (update or {}).get("logs", []):
+                        emit({"event": "log", "node": node, "message": message})
+                    trace = (update or {}).get("trace") or [{}]
+                    emit({"event": "node_end", "node": node, "trace": trace[-1]})
+            elif mode == "custom":
+                emit(chunk)
+            elif mode == "values":
+                final_state = chunk
+    return build_result(_this_run(final_state, history))
+
+
+@dataclass
+class Job:
+    id: str
+    state: State
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    finished_at: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    future: Optional[Future] = field(default=None, repr=False)
+
+    @property
+    def status(self) -> str:
+        if self.error is not None:
+            return "failed"
+        if self.result is not None:
+            return "completed"
+        if self.future is not None and self.future.running():
+            return "running"
+        return "queued"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """Runs workflow invocations on a bounded worker pool and tracks their status.
+
+    The pool size and kind (threads or processes) come from settings. Finished jobs
+    are kept in memory up to JOB_HISTORY_LIMIT so clients can poll GET /jobs/{id}.
+    """
+
+    def __init__(self, workers: int = None, executor: str = None, max_pending: int = None, history_limit: int = None):
+        self.workers = workers or settings.JOB_WORKERS
+        self.executor_kind = executor or settings.JOB_EXECUTOR
+        self.max_pending = max_pending or settings.JOB_MAX_PENDING
+        self.history_limit = history_limit or settings.JOB_HISTORY_LIMIT
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor: Executor = self._make_executor()
+        # Streaming runs push events through an in-process callback, so they always use threads
+        if isinstance(self._executor, ThreadPoolExecutor):
+            self._stream_executor = self._executor
+        else:
+            self._stream_executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="notes2blog-stream")
+
+    def _make_executor(self) -> Executor:
+        if self.executor_kind == "process":
+            # Each worker process compiles its own workflow as soon as it starts. Spawned, not
+            # forked: a fork while the warm-up or cleanup threads are importing DSPy/LangGraph
+            # copies their held import locks, and the worker then hangs in get_workflow
+            return ProcessPoolExecutor(max_workers=self.workers, initializer=get_workflow, mp_context=multiprocessing.get_context("spawn"))
+        if self.executor_kind == "thread":
+            return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="notes2blog-job")
+        raise ValueError(f"Unknown JOB_EXECUTOR: {self.executor_kind!r} (expected 'thread' or 'process')")
+
+    def pending(self) -> int:
+        with self._lock:
+            return self._pending()
+
+    def _pending(self) -> int:
+        # Callers hold _lock
+        return sum(1 for job in self._jobs.values() if job.future is not None and not job.future.done())
+
+    def submit(self, state: State, on_event: Callable[[Dict[str, Any]], None] = None) -> Job:
+        """Queue a workflow run. With on_event, the run streams progress events to that callback."""
+        job_id = uuid.uuid4().hex
+        return self._start(Job(id=job_id, state={**state, "job_id": job_id}), on_event)
+
+    def resume(self, job_id: str, node: str, edits: Dict[str, Any], on_event: Callable[[Dict[str, Any]], None] = None) -> Job:
+        """Rerun an earlier job from `node` with edited state, taking everything upstream from its checkpoint.
+
+        The rerun keeps the job id, so it replaces the job's entry here, its artifact directory
+        and its catalog post.
+        """
+        from .checkpoints import checkpointer
+
+        if not checkpointer.has_thread(job_id):
+            raise JobNotFound(f"No checkpoint for job {job_id}")
+        # A fresh retry budget, so a feedback round gets up to the usual number of React fixes
+        state: State = {**edits, "job_id": job_id, "resume_from": node, "retry_count": 0}
+        return self._start(Job(id=job_id, state=state), on_event)
+
+    def _start(self, job: Job, on_event: Callable[[Dict[str, Any]], None] = None) -> Job:
+        # Check capacity, register and submit in one step, so concurrent requests cannot all
+        # pass the check before any of them is counted
+        with self._lock:
+            if self._pending() >= self.max_pending:
+                raise JobQueueFull(f"Too many pending jobs (limit {self.max_pending}), try again later")
+            existing = self._jobs.get(job.id)
+            if existing is not None and existing.finished_at is None:
+                raise JobBusy(f"Job {job.id} is still {existing.status}")
+            if on_event is not None:
+                job.future = self._stream_executor.submit(stream_workflow, job.state, on_event)
+            else:
+                job.future = self._executor.submit(run_workflow, job.state)
+            self._jobs[job.id] = job
+            self._jobs.move_to_end(job.id)
+            self._evict()
+        job.future.add_done_callback(lambda fut, job=job: self._finish(job, fut))
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    async def wait(self, job: Job) -> Job:
+        """Wait for a job without blocking the event loop."""
+        future = job.future
+        if future is not None:
+            try:
+                await asyncio.wrap_future(future)
+            except BaseException:
+                pass  # The failure is recorded on the job by _finish
+        return job
+
+    def _finish(self, job: Job, fut: Future) -> None:
+        if fut.cancelled():
+            job.error = "Job was cancelled before it started"
+        elif fut.exception() is not None:
+            logging.error(f"Error: {str(fut.exception())}, Current state: {job.state}")
+            job.error = str(fut.exception())
+        else:
+            job.result = fut.result()
+            metrics.observe_trace(job.result.get("trace"))
+        finished = datetime.now()
+        status = "failed" if job.error is not None else "completed"
+        metrics.jobs_finished.inc(status=status)
+        metrics.job_duration.observe((finished - datetime.fromisoformat(job.created_at)).total_seconds(), status=status)
+        job.finished_at = finished.isoformat()
+        job.future = None
+
+    def _evict(self) -> None:
+        # Drop the oldest finished jobs once the history grows past the limit
+        overflow = len(self._jobs) - self.history_limit
+        if overflow <= 0:
+            return
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished_at is not None][:overflow]:
+            del self._jobs[job_id]
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        if self._stream_executor is not self._executor:
+            self._stream_executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,225 @@
+from __future__ import annotations
+import re
+from typing import List, Optional, Tuple
+
+# Pure-Python syntax check for the React (JSX/TSX) components the pipeline generates. It is not
+# a full parser: it tracks strings, comments, template literals, regex literals, brackets and
+# JSX tags closely enough to find the mistakes LMs make (unclosed or mismatched tags, stray
+# braces, unterminated strings) and report where they are, in a few milliseconds.
+
+_SKIP = re.compile(r"(?:\s+|//[^\n]*|/\*.*?\*/)*", re.S)  # Whitespace and comments
+_IDENT = re.compile(r"[A-Za-z_$][\w$]*")
+_NUMBER = re.compile(r"\d[\w.]*")
+_STRING = {'"': re.compile(r'"(?:[^"\\\n]|\\.)*"', re.S), "'": re.compile(r"'(?:[^'\\\n]|\\.)*'", re.S)}
+_TEMPLATE_TEXT = re.compile(r"(?:[^`\\$]|\\.|\$(?!\{))*", re.S)
+_REGEX = re.compile(r"/(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*")
+_PUNCT = re.compile(r"=>|\.\.\.|\?\.(?!\d)|[=!]==?|&&=?|\|\|=?|\?\?=?|\+\+|--|<<=?|>>>?=?|[-+*/%&|^<>]=|[^\w\s]")
+# `<T,>` / `<T extends X>` in expression position start a generic arrow function, not JSX
+_GENERIC = re.compile(r"<\s*[A-Za-z_$][\w$]*\s*(?:,|extends\b)")
+_TAG_NAME = re.compile(r"[A-Za-z_$][\w$.:-]*")
+_ATTR_NAME = re.compile(r"[A-Za-z_$][\w$:-]*")
+_ATTR_STRING = re.compile(r'"[^"]*"|\'[^\']*\'')
+_JSX_TEXT = re.compile(r"[^{}<>]*")
+
+_OPENERS = {"(": ")", "[": "]", "{": "}"}
+_CLOSERS = {")", "]", "}"}
+# After these a `<` or `/` starts an operand (JSX, regex) rather than being an operator
+_OPERAND_KEYWORDS = {"return", "typeof", "instanceof", "in", "of", "new", "delete", "void", "throw", "case", "do", "else", "yield", "await", "default"}
+_VALUE_PUNCT = {")", "]", "}", "++", "--"}
+
+
+class JSXSyntaxError(ValueError):
+    def __init__(self, message: str, line: int, column: int):
+        super().__init__(f"Line {line}, column {column}: {message}")
+        self.message, self.line, self.column = message, line, column
+
+
+class _Error(Exception):
+    def __init__(self, message: str, pos: int):
+        self.message, self.pos = message, pos
+
+
+class _Scanner:
+    def __init__(self, code: str):
+        self.code = code
+        self.pos = 0
+
+    def where(self, pos: int) -> str:
+        line = self.code.count("\n", 0, pos) + 1
+        return f"{line}:{pos - (self.code.rfind(chr(10), 0, pos) + 1) + 1}"
+
+    def skip(self) -> None:
+        self.pos = _SKIP.match(self.code, self.pos).end()
+        if self.code.startswith("/*", self.pos):
+            raise _Error("Unterminated /* comment", self.pos)
+
+    def js(self, closer: Optional[str] = None, opened: int = 0) -> None:
+        """Scan JavaScript up to the `closer` bracket that ends the current expression (or to the end)."""
+        code = self.code
+        stack: List[Tuple[str, int]] = []
+        operand = True  # Whether the next token starts an operand
+        while True:
+            self.skip()
+            pos = self.pos
+            if pos >= len(code):
+                if stack:
+                    char, at = stack[-1]
+                    raise _Error(f"'{char}' opened at {self.where(at)} is never closed", at)
+                if closer is not None:
+                    raise _Error(f"'{_opener(closer)}' opened at {self.where(opened)} is never closed", opened)
+                return
+            char = code[pos]
+            if char in _OPENERS:
+                stack.append((char, pos))
+                self.pos, operand = pos + 1, True
+            elif char in _CLOSERS:
+                if not stack:
+                    if char == closer:
+                        self.pos = pos + 1
+                        return
+                    raise _Error(f"Unexpected '{char}'" + (f", expected '{closer}' to close '{_opener(closer)}' at {self.where(opened)}" if closer else ""), pos)
+                open_char, at = stack.pop()
+                if _OPENERS[open_char] != char:
+                    raise _Error(f"Unexpected '{char}', expected '{_OPENERS[open_char]}' to close '{open_char}' at {self.where(at)}", pos)
+                self.pos, operand = pos + 1, False
+            elif char in _STRING:
+                match = _STRING[char].match(code, pos)
+                if match is None:
+                    raise _Error("Unterminated string", pos)
+                self.pos, operand = match.end(), False
+            elif char == "`":
+                self.template()
+                operand = False
+            elif char == "<" and operand and not _GENERIC.match(code, pos) and re.match(r"<\s*[A-Za-z_$>]", code[pos:pos + 64]):
+                self.element()
+                operand = False
+            elif char == "/" and operand and (match := _REGEX.match(code, pos)):
+                self.pos, operand = match.end(), False
+            elif match := _IDENT.match(code, pos):
+                self.pos, operand = match.end(), match.group() in _OPERAND_KEYWORDS
+            elif match := _NUMBER.match(code, pos):
+                self.pos, operand = match.end(), False
+            else:
+                match = _PUNCT.match(code, pos)
+                self.pos, operand = match.end(), match.group() not in _VALUE_PUNCT
+
+    def template(self) -> None:
+        start = self.pos
+        self.pos += 1
+        while True:
+            self.pos = _TEMPLATE_TEXT.match(self.code, self.pos).end()
+            if self.code.startswith("`", self.pos):
+                self.pos += 1
+                return
+            if self.code.startswith("${", self.pos):
+                self.pos += 2
+                self.js("}", self.pos - 1)
+                continue
+            raise _Error("Unterminated template literal", start)
+
+    def element(self) -> None:
+        """A JSX element or fragment, starting at its `<`."""
+        start = self.pos
+        self.pos += 1
+        self.skip()
+        name = ""
+        if (match := _TAG_NAME.match(self.code, self.pos)) is not None:
+            name = match.group()
+            self.pos = match.end()
+        label = f"<{name}>" if name else "fragment <>"
+        while True:
+            self.skip()
+            pos = self.pos
+            if pos >= len(self.code):
+                raise _Error(f"Opening tag {label} is never finished", start)
+            char = self.code[pos]
+            if self.code.startswith("/>", pos):
+                if not name:
+                    raise _Error("A fragment cannot be self-closing", pos)
+                self.pos = pos + 2
+                return
+            if char == ">":
+                self.pos = pos + 1
+                break
+            if char == "{":
+                self.pos = pos + 1
+                self.js("}", pos)  # {...spread}
+                continue
+            if not name:
+                raise _Error("Fragments cannot have attributes", pos)
+            match = _ATTR_NAME.match(self.code, pos)
+            if match is None:
+                raise _Error(f"Unexpected '{char}' in {label}", pos)
+            self.pos = match.end()
+            self.skip()
+            if self.code.startswith("=", self.pos):
+                self.pos += 1
+                self.attribute_value(match.group())
+        self.children(name, label, start)
+
+    def attribute_value(self, attribute: str) -> None:
+        self.skip()
+        pos = self.pos
+        char = self.code[pos:pos + 1]
+        if char in ('"', "'"):
+            match = _ATTR_STRING.match(self.code, pos)
+            if match is None:
+                raise _Error(f"Unterminated string in attribute {attribute}", pos)
+            self.pos = match.end()
+        elif char == "{":
+            self.pos = pos + 1
+            self.js("}", pos)
+        elif char == "<":
+            self.element()
+        else:
+            raise _Error(f"Attribute {attribute} needs a \"string\" or {{expression}} value", pos)
+
+    def children(self, name: str, label: str, start: int) -> None:
+        code = self.code
+        while True:
+            self.pos = _JSX_TEXT.match(code, self.pos).end()
+            pos = self.pos
+            if pos >= len(code):
+                raise _Error(f"{label} opened at {self.where(start)} is never closed", start)
+            char = code[pos]
+            if char == "{":
+                self.pos = pos + 1
+                self.js("}", pos)
+            elif char == "<":
+                self.pos = pos + 1
+                self.skip()
+                if not code.startswith("/", self.pos):
+                    self.pos = pos
+                    self.element()
+                    continue
+                self.pos += 1
+                self.skip()
+                closing = ""
+                if (match := _TAG_NAME.match(code, self.pos)) is not None:
+                    closing = match.group()
+                    self.pos = match.end()
+                self.skip()
+                if not code.startswith(">", self.pos):
+                    raise _Error(f"Closing tag </{closing}> is missing its '>'", pos)
+                self.pos += 1
+                if closing != name:
+                    raise _Error(f"Expected </{name}> to close {label} opened at {self.where(start)}, found </{closing}>", pos)
+                return
+            else:
+                escape = "{'>'}" if char == ">" else "{'}'}"
+                raise _Error(f"Unexpected '{char}' in JSX text inside {label} (write {escape})", pos)
+
+
+def _opener(closer: str) -> str:
+    return {")": "(", "]": "[", "}": "{"}[closer]
+
+
+def find_syntax_error(code: str) -> Optional[JSXSyntaxError]:
+    """The first syntax error in a JSX/TSX module, with its 1-based line and column, or None."""
+    scanner = _Scanner(code)
+    try:
+        scanner.js()
+    except _Error as e:
+        line = code.count("\n", 0, e.pos) + 1
+        return JSXSyntaxError(e.message, line, e.pos - (code.rfind("\n", 0, e.pos) + 1) + 1)
+    return None
@@ -1,61 +1,237 @@
 from __future__ import annotations
-from fastapi import FastAPI, UploadFile, File
-from fastapi.responses import JSONResponse
-from rich import print as rprint
-import logging
-
+from fastapi import FastAPI, Request, UploadFile, File
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
+import asyncio
+import json
+from pathlib import Path
+from typing import Optional
+
+from . import metrics
 from .config import settings
-from .storage import save_upload
-from .state import State
-from .graph import graph
+from .storage import UploadTooLarge, save_upload_stream
+from .state import REACT_MODES, RESUME_FIELDS, RESUME_NODES, State
+from .jobs import JobBusy, JobManager, JobNotFound, JobQueueFull
+from .batch import BATCH_MODES, run_batch
+from .streaming import stream_job
+from .ocr_cache import ocr_cache
+from .artifacts import artifacts
+from .catalog import catalog
+from .warmup import warmup
 
 
 app = FastAPI(title="Notes → Blog (LangGraph + DSPy)")
-workflow = graph()
+jobs = JobManager()
+metrics.Gauge("notes2blog_jobs_pending", "Jobs queued or running", jobs.pending)
+MULTIPART_OVERHEAD = 64 * 1024  # Room for the multipart boundaries and part headers around the file
+
+
+@app.middleware("http")
+async def reject_large_uploads(request: Request, call_next):
+    # FastAPI reads the whole form before /ingest runs, so turn away uploads that declare a
+    # size over the limit before any of the body is received
+    if request.url.path == "/ingest":
+        try:
+            length = int(request.headers.get("content-length", 0))
+        except ValueError:
+            return JSONResponse({"error": "Invalid Content-Length"}, status_code=400)
+        if length > settings.MAX_FILE_SIZE + MULTIPART_OVERHEAD:
+            return JSONResponse({"error": f"Upload exceeds the {settings.MAX_FILE_SIZE} byte limit"}, status_code=413)
+    return await call_next(request)
 
 
 
 
 @app.post("/ingest")
 async def ingest(file: UploadFile = File(...)):
-    content = await file.read()
     filename = file.filename or "uploaded_image.jpg"
-    path = save_upload(filename, content)
-    return {"image_path": path}
+    try:
+        path, duplicate = await save_upload_stream(filename, file.read)
+    except UploadTooLarge as e:
+        return JSONResponse({"error": str(e)}, status_code=413)
+    return {"image_path": path, "duplicate": duplicate}
 
 
 
 
-@app.post("/process")
+@app.post("/process", status_code=202)
 async def process(payload: dict):
     image_path = payload.get("image_path")
     if not image_path:
         return JSONResponse({"error": "image_path required"}, status_code=400)
 
+    react_mode = payload.get("react_mode") or settings.REACT_MODE
+    if react_mode not in REACT_MODES:
+        return JSONResponse({"error": f"react_mode must be one of {', '.join(REACT_MODES)}"}, status_code=400)
+
+    state: State = {"image_path": image_path, "logs": [], "no_cache": bool(payload.get("no_cache", False)), "react_mode": react_mode}
+    try:
+        job = jobs.submit(state)
+    except JobQueueFull as e:
+        return JSONResponse({"error": str(e)}, status_code=503)
+    return {"job_id": job.id, "status": job.status}
+
+
+
+
+@app.post("/process/stream")
+async def process_stream(payload: dict):
+    image_path = payload.get("image_path")
+    if not image_path:
+        return JSONResponse({"error": "image_path required"}, status_code=400)
+
+    react_mode = payload.get("react_mode") or settings.REACT_MODE
+    if react_mode not in REACT_MODES:
+        return JSONResponse({"error": f"react_mode must be one of {', '.join(REACT_MODES)}"}, status_code=400)
+
+    state: State = {"image_path": image_path, "logs": [], "no_cache": bool(payload.get("no_cache", False)), "react_mode": react_mode}
+    try:
+        events = await stream_job(jobs, state)
+    except JobQueueFull as e:
+        return JSONResponse({"error": str(e)}, status_code=503)
+    return StreamingResponse(events, media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+
+
+@app.post("/process/batch")
+async def process_batch(payload: dict):
+    image_paths = payload.get("image_paths")
+    mode = payload.get("mode", "merge")
+    if not isinstance(image_paths, list) or not image_paths:
+        return JSONResponse({"error": "image_paths (non-empty list) required"}, status_code=400)
+    if len(image_paths) > settings.BATCH_MAX_IMAGES:
+        return JSONResponse({"error": f"At most {settings.BATCH_MAX_IMAGES} images per batch"}, status_code=400)
+    if mode not in BATCH_MODES:
+        return JSONResponse({"error": f"mode must be one of {', '.join(BATCH_MODES)}"}, status_code=400)
+
+    async def events():
+        # One JSON object per line, flushed as soon as each page or job finishes
+        async for event in run_batch(image_paths, mode, jobs, no_cache=bool(payload.get("no_cache", False))):
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        return JSONResponse({"error": f"Unknown job: {job_id}"}, status_code=404)
+    return job.to_dict()
+
+
+
+
+@app.post("/jobs/{job_id}/resume", status_code=202)
+async def resume_job(job_id: str, payload: dict):
+    if not settings.CHECKPOINT_ENABLED:
+        return JSONResponse({"error": "Resuming jobs requires CHECKPOINT_ENABLED"}, status_code=400)
+    node = payload.get("from")
+    edits = payload.get("state") or {}
+    if node not in RESUME_NODES:
+        return JSONResponse({"error": f"from must be one of {', '.join(RESUME_NODES)}"}, status_code=400)
+    if not isinstance(edits, dict) or set(edits) - set(RESUME_FIELDS):
+        return JSONResponse({"error": f"state may only set {', '.join(RESUME_FIELDS)}"}, status_code=400)
+    if edits.get("react_mode", REACT_MODES[0]) not in REACT_MODES:
+        return JSONResponse({"error": f"react_mode must be one of {', '.join(REACT_MODES)}"}, status_code=400)
+
+    edits["no_cache"] = bool(payload.get("no_cache", False))
+    try:
+        job = await asyncio.to_thread(jobs.resume, job_id, node, edits)
+    except JobNotFound as e:
+        return JSONResponse({"error": str(e)}, status_code=404)
+    except JobBusy as e:
+        return JSONResponse({"error": str(e)}, status_code=409)
+    except JobQueueFull as e:
+        return JSONResponse({"error": str(e)}, status_code=503)
+    return {"job_id": job.id, "status": job.status}
+
 
-    state: State = {"image_path": image_path, "logs": []}
+
+
+@app.get("/jobs/{job_id}/artifacts/{name}")
+async def get_artifact(job_id: str, name: str):
     try:
-        final_state = workflow.invoke(state)
-        rprint({"logs": final_state.get("logs", [])})
-        return {
-        "theme": final_state.get("theme"),
-        "outline": final_state.get("outline"),
-        "blog_markdown": final_state.get("blog_markdown"),
-        "react_code": final_state.get("react_code"),
-        "logs": final_state.get("logs", []),
-        "validated": final_state.get("validated", False),
-        "metadata": {
-            "title": final_state.get("title", ""),
-            "summary": final_state.get("summary", ""),
-            "tags": final_state.get("tags", []),
-            "slug": final_state.get("slug", ""),
-            "reading_time": final_state.get("reading_time", 5),
-        }
-        }
-    except Exception as e:
-        logging.error(f"Error: {str(e)}, Current state: {state}")
-        print(f"Error: {str(e)}, Current state: {state}")
-        return JSONResponse({"error": str(e)}, status_code=500)
+        path = await asyncio.to_thread(artifacts.file, job_id, name)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    if path is None:
+        return JSONResponse({"error": f"No artifact {name} for job {job_id}"}, status_code=404)
+    return FileResponse(path)
+
+
+
+
+@app.get("/api/blogs")
+async def list_blogs(limit: int = 20, cursor: Optional[str] = None, tag: Optional[str] = None):
+    try:
+        return await asyncio.to_thread(catalog.list_posts, limit, cursor, tag)
+    except ValueError:
+        return JSONResponse({"error": f"Invalid cursor: {cursor}"}, status_code=400)
+
+
+
+
+@app.get("/api/blogs/{slug}")
+async def get_blog(slug: str):
+    post = await asyncio.to_thread(catalog.get, slug)
+    if post is None:
+        return JSONResponse({"error": f"Unknown blog: {slug}"}, status_code=404)
+
+    def read_article(name: str) -> Optional[str]:
+        path = Path(post["artifact_dir"]) / name
+        return path.read_text(encoding="utf-8") if path.exists() else None
+
+    post["blog_markdown"] = await asyncio.to_thread(read_article, "Article.md")
+    post["react_code"] = await asyncio.to_thread(read_article, "Article.tsx")
+    return post
+
+
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    from .modules.lm_cache import lm_cache
+    from .modules.openai_pool import openai_pool
+    from .modules.ocr_pool import tesseract_pool
+    return {"ocr": ocr_cache.stats(), "lm": lm_cache.stats(), "openai": openai_pool.stats(), "tesseract": tesseract_pool.stats()}
+
+
+
+
+@app.on_event("startup")
+async def startup():
+    if settings.WARMUP_ON_STARTUP:
+        warmup.start()
+    asyncio.get_running_loop().run_in_executor(None, artifacts.cleanup)
+
+
+
+
+@app.get("/ready")
+async def ready():
+    if not settings.WARMUP_ON_STARTUP:
+        return {"ready": True, "warmup": "disabled"}
+    status = warmup.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    jobs.shutdown()
+    from .modules.ocr_pool import tesseract_pool
+    tesseract_pool.shutdown()
 
 
 
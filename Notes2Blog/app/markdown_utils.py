@@ -0,0 +1,21 @@
+from __future__ import annotations
+import re
+
+# Markdown helpers shared by the catalog, local metadata and the React template; kept free of
+# DSPy and the OpenAI client so importing them stays cheap.
+
+_parser = None
+
+
+def slugify(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", (text or "").lower()).strip("-")
+
+
+def parse_markdown(markdown: str) -> list:
+    """markdown-it (CommonMark) block tokens, with the parser built on first use."""
+    global _parser
+    if _parser is None:
+        from markdown_it import MarkdownIt
+
+        _parser = MarkdownIt("commonmark")
+    return _parser.parse(markdown or "")
@@ -0,0 +1,163 @@
+from __future__ import annotations
+import contextvars
+import functools
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Per-node usage recorded while a graph node runs; see instrument() and record()
+SPAN_FIELDS = ("lm_calls", "lm_cache_hits", "ocr_cache_hits", "api_requests", "prompt_tokens", "completion_tokens", "retries", "image_bytes")
+
+_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("metrics_span", default=None)
+
+
+class Span:
+    """Counters for one node execution. Updated from the node's thread and, for API calls,
+    from the OpenAI pool's event loop thread, hence the lock."""
+
+    def __init__(self, node: str):
+        self.node = node
+        self.values = dict.fromkeys(SPAN_FIELDS, 0)
+        self._lock = threading.Lock()
+
+    def add(self, field: str, amount: float = 1) -> None:
+        with self._lock:
+            self.values[field] += amount
+
+    def to_dict(self, seconds: float) -> Dict[str, Any]:
+        # Compact: zero counters are left out of the trace
+        entry = {"node": self.node, "ms": round(seconds * 1000, 1)}
+        entry.update({field: value for field, value in self.values.items() if value})
+        return entry
+
+
+def current_span() -> Optional[Span]:
+    return _span.get()
+
+
+def record(field: str, amount: float = 1) -> None:
+    """Add to a counter of the node currently running in this thread (no-op outside a node)."""
+    span = _span.get()
+    if span is not None:
+        span.add(field, amount)
+
+
+def instrument(node: str, fn: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """Wrap a graph node so its wall time and usage are appended to State.trace."""
+
+    @functools.wraps(fn)
+    def wrapper(state):
+        span = Span(node)
+        token = _span.set(span)
+        started = time.perf_counter()
+        try:
+            update = fn(state)
+        except Exception:
+            node_errors.inc(node=node)
+            raise
+        finally:
+            _span.reset(token)
+        update = dict(update or {})
+        update["trace"] = [span.to_dict(time.perf_counter() - started)]
+        return update
+
+    return wrapper
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...], le: Optional[str] = None) -> str:
+    pairs = list(zip(labelnames, values))
+    if le is not None:
+        pairs.append(("le", le))
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name, self.documentation, self.labelnames = name, documentation, tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value:g}")
+        return lines
+
+
+class Histogram:
+    DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.name, self.documentation, self.labelnames = name, documentation, tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List[float]] = {}  # bucket counts..., sum, count
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            series = self._series.setdefault(key, [0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, f'{bound:g}')} {count:g}")
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, '+Inf')} {series[-1]:g}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {series[-2]:g}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {series[-1]:g}")
+        return lines
+
+
+class Gauge:
+    """Value read from a callback at scrape time."""
+
+    def __init__(self, name: str, documentation: str, read: Callable[[], float]):
+        self.name, self.documentation, self.read = name, documentation, read
+        REGISTRY.append(self)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge", f"{self.name} {self.read():g}"]
+
+
+REGISTRY: List[Any] = []
+
+node_duration = Histogram("notes2blog_node_duration_seconds", "Wall time of each graph node", ["node"])
+node_usage = Counter("notes2blog_node_usage_total", "LM calls, tokens, cache hits, retries and image bytes per graph node", ["node", "kind"])
+node_errors = Counter("notes2blog_node_errors_total", "Graph node executions that raised", ["node"])
+job_duration = Histogram("notes2blog_job_duration_seconds", "Wall time of whole workflow runs", ["status"])
+jobs_finished = Counter("notes2blog_jobs_total", "Finished jobs", ["status"])
+
+
+def observe_trace(trace: List[Dict[str, Any]]) -> None:
+    """Feed a finished run's trace into the metrics. Done in the API process when a job
+    finishes, so it works the same with thread and process workers."""
+    for entry in trace or []:
+        node_duration.observe(entry.get("ms", 0) / 1000, node=entry["node"])
+        for field in SPAN_FIELDS:
+            if entry.get(field):
+                node_usage.inc(entry[field], node=entry["node"], kind=field)
+
+
+def render() -> str:
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
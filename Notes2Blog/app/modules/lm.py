@@ -0,0 +1,69 @@
+import threading
+import anyio
+import dspy
+
+from ..config import settings
+from .openai_pool import openai_pool
+
+
+_lock = threading.Lock()
+
+# Per-call options DSPy may pass that the OpenAI API does not accept
+_DSPY_ONLY_KWARGS = {"rollout_id", "num_retries", "cache", "headers"}
+
+
+class PooledLM(dspy.BaseLM):
+    """DSPy LM that sends its requests through the shared, rate-limited OpenAI client pool."""
+
+    def __init__(self, model: str, temperature: float = 0.0, max_tokens: int = 1000, **kwargs):
+        super().__init__(model=model, model_type="chat", temperature=temperature, max_tokens=max_tokens, cache=False, **kwargs)
+
+    def forward(self, prompt=None, messages=None, **kwargs):
+        messages = messages or [{"role": "user", "content": prompt}]
+        request = {**self.kwargs, **kwargs}
+        request = {key: value for key, value in request.items() if key not in _DSPY_ONLY_KWARGS and value is not None}
+        request.update(model=self.model.split("/", 1)[-1], messages=messages)
+
+        stream = getattr(dspy.settings, "send_stream", None)
+        if stream is None:
+            return openai_pool.chat(**request)
+        return self._forward_streaming(request, stream)
+
+    def _forward_streaming(self, request, stream):
+        # Inside dspy.streamify: relay the pool's chunks into DSPy's stream so its listeners see tokens
+        caller = getattr(dspy.settings, "caller_predict", None)
+
+        async def relay():
+            import asyncio
+            from litellm import ModelResponseStream
+
+            loop = asyncio.get_running_loop()
+            queue: asyncio.Queue = asyncio.Queue()
+            future = openai_pool.submit(request, on_chunk=lambda chunk: loop.call_soon_threadsafe(queue.put_nowait, chunk))
+            future.add_done_callback(lambda _: loop.call_soon_threadsafe(queue.put_nowait, None))
+            while (event := await queue.get()) is not None:
+                if not event.choices:
+                    continue  # The trailing usage-only chunk
+                # DSPy's stream listeners only recognise LiteLLM's chunk type
+                chunk = ModelResponseStream(**event.model_dump(exclude_none=True))
+                if caller is not None:
+                    chunk.predict_id = id(caller)
+                await stream.send(chunk)
+            return future.result()
+
+        return anyio.from_thread.run(relay)
+
+
+def configure_lm() -> None:
+    """Configure the global DSPy LM on first use. Leaves an LM that is already configured (e.g. by a benchmark) alone."""
+    if dspy.settings.lm is not None:
+        return
+    with _lock:
+        if dspy.settings.lm is not None:
+            return
+        print(f"Using OpenAI model: {settings.OPENAI_TEXT_MODEL}")
+        if settings.USE_OPENAI_VISION and settings.OPENAI_API_KEY:
+            lm = PooledLM(model=settings.OPENAI_TEXT_MODEL, temperature=settings.LM_TEMPERATURE, max_tokens=settings.MAX_TOKENS)
+        else:
+            lm = dspy.LM('mock')
+        dspy.configure(lm=lm)
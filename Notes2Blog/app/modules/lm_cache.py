@@ -0,0 +1,210 @@
+from __future__ import annotations
+import contextvars
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import dspy
+
+from ..config import settings
+from .lm import configure_lm
+from ..metrics import record
+
+
+_bypass = contextvars.ContextVar("lm_cache_bypass", default=False)
+
+
+@contextmanager
+def bypass_cache():
+    """Skip the LM cache for every DSPy call made inside this block (and the graph nodes it runs)."""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+class LMCache:
+    """SQLite-backed cache of DSPy predictions with least-recently-used eviction.
+
+    A row holds the JSON-encoded fields of one Prediction. Keys cover the module's
+    signatures and demos, the LM model and sampling settings, and the call inputs,
+    so any change to the prompt or model is a miss rather than a stale hit.
+    """
+
+    def __init__(self, path: str = None, max_entries: int = None, max_bytes: int = None):
+        self.path = Path(path or settings.LM_CACHE_PATH or Path(settings.OUTPUT_DIR) / "cache" / "lm_cache.sqlite3")
+        self.max_entries = max_entries or settings.LM_CACHE_MAX_ENTRIES
+        self.max_bytes = max_bytes or settings.LM_CACHE_MAX_BYTES
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    signature TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            db = self._db()
+            row = db.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.counters["misses"] += 1
+                return None
+            db.execute("UPDATE entries SET last_access = ?, hits = hits + 1 WHERE key = ?", (time.time(), key))
+            db.commit()
+            self.counters["hits"] += 1
+            return json.loads(row[0])
+
+    def put(self, key: str, signature: str, model: str, value: Dict[str, Any]) -> None:
+        payload = json.dumps(value, default=str)
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO entries (key, signature, model, value, size, created_at, last_access, hits) VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+                (key, signature, model, payload, len(payload), now, now),
+            )
+            self.counters["writes"] += 1
+            self._evict(db)
+            db.commit()
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        count, size = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if count <= self.max_entries and size <= self.max_bytes:
+            return
+        # Walk from the least recently used end until both limits hold again
+        doomed = []
+        for key, entry_size in db.execute("SELECT key, size FROM entries ORDER BY last_access ASC"):
+            if count <= self.max_entries and size <= self.max_bytes:
+                break
+            doomed.append((key,))
+            count -= 1
+            size -= entry_size
+        db.executemany("DELETE FROM entries WHERE key = ?", doomed)
+        self.counters["evictions"] += len(doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            db = self._db()
+            db.execute("DELETE FROM entries")
+            db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count, size = self._db().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+            lookups = self.counters["hits"] + self.counters["misses"]
+            return {
+                **self.counters,
+                "hit_rate": round(self.counters["hits"] / lookups, 4) if lookups else 0.0,
+                "entries": count,
+                "bytes": size,
+            }
+
+
+lm_cache = LMCache()
+
+
+def _describe(module: dspy.Module) -> Dict[str, Any]:
+    """Everything about a module that shapes its prompt: signatures and few-shot demos."""
+    predictors = {}
+    for name, predictor in module.named_predictors():
+        signature = predictor.signature
+        predictors[name] = {
+            "instructions": signature.instructions,
+            "fields": [[field_name, str(field.annotation), (field.json_schema_extra or {}).get("desc")] for field_name, field in signature.fields.items()],
+            "demos": [demo.toDict() if hasattr(demo, "toDict") else dict(demo) for demo in predictor.demos],
+        }
+    return predictors
+
+
+def cache_key(module: dspy.Module, inputs: Dict[str, Any]) -> str:
+    lm = dspy.settings.lm
+    material = {
+        "module": _describe(module),
+        "model": getattr(lm, "model", str(lm)),
+        "temperature": getattr(lm, "kwargs", {}).get("temperature"),
+        "max_tokens": getattr(lm, "kwargs", {}).get("max_tokens"),
+        "inputs": inputs,
+    }
+    return hashlib.sha256(json.dumps(material, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _store(module: dspy.Module, key: str, pred: dspy.Prediction) -> None:
+    outputs = [name for _, predictor in module.named_predictors() for name in predictor.signature.output_fields]
+    signature = f"{type(module).__name__}:{','.join(outputs)}"
+    lm_cache.put(key, signature, getattr(dspy.settings.lm, "model", ""), pred.toDict())
+
+
+def cached_call(module: dspy.Module, **inputs) -> dspy.Prediction:
+    """Call a DSPy module, serving byte-identical requests from the LM cache."""
+    configure_lm()
+    if not settings.LM_CACHE_ENABLED or _bypass.get():
+        record("lm_calls")
+        return module(**inputs)
+    key = cache_key(module, inputs)
+    hit = lm_cache.get(key)
+    if hit is not None:
+        record("lm_cache_hits")
+        return dspy.Prediction(**hit)
+    record("lm_calls")
+    pred = module(**inputs)
+    _store(module, key, pred)
+    return pred
+
+
+def cached_stream(module: dspy.Module, field: str, on_token: Callable[[str], None], **inputs) -> dspy.Prediction:
+    """Like cached_call, but passes chunks of one output field to on_token as the LM produces them.
+
+    A cache hit (or an LM that cannot stream) delivers the whole field as a single chunk.
+    """
+    configure_lm()
+    use_cache = settings.LM_CACHE_ENABLED and not _bypass.get()
+    key = cache_key(module, inputs) if use_cache else None
+    hit = lm_cache.get(key) if use_cache else None
+    if hit is not None:
+        record("lm_cache_hits")
+        on_token(hit.get(field) or "")
+        return dspy.Prediction(**hit)
+    record("lm_calls")
+
+    streaming = dspy.streamify(
+        module,
+        stream_listeners=[dspy.streaming.StreamListener(signature_field_name=field)],
+        async_streaming=False,
+    )
+    pred, streamed = None, False
+    for chunk in streaming(**inputs):
+        if isinstance(chunk, dspy.streaming.StreamResponse):
+            on_token(chunk.chunk)
+            streamed = True
+        elif isinstance(chunk, dspy.Prediction):
+            pred = chunk
+    if not streamed:
+        on_token(getattr(pred, field, "") or "")
+    if use_cache:
+        _store(module, key, pred)
+    return pred
@@ -0,0 +1,102 @@
+from __future__ import annotations
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List
+
+from ..config import settings
+from ..markdown_utils import parse_markdown, slugify
+
+# Metadata that follows from the article itself (slug, reading time, counts, keyword tags and a
+# lead-paragraph summary) is computed here, without the LM, so it is instant and the same on
+# every run. METADATA_MODE=polish additionally asks the LM for a better title and summary.
+
+WORD_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9'’-]*")
+KEYWORD_RE = re.compile(r"[a-z][a-z'-]*[a-z]")
+SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are aren't as at be because been before being below between
+both but by can can't cannot could couldn't did didn't do does doesn't doing don't down during each even ever every
+few for from further get gets getting go goes going got had hadn't has hasn't have haven't having he her here hers
+herself him himself his how however i i'm i've if in into is isn't it it's its itself just let like lot lots made make
+makes making many may me might more most much must my myself need needs new no nor not now of off often on once one
+only or other others our ours ourselves out over own part per really same says see seem seems she should shouldn't
+since so some something still such take than that that's the their theirs them themselves then there there's these
+they they're thing things think this those though through thus to too two under until up upon us use used uses using
+very via want wants was wasn't way ways we we're well were weren't what what's when where whether which while who
+whom whose why will with within without won't would wouldn't yet you you're your yours yourself yourselves
+""".split())
+
+
+def _outline(blog_markdown: str) -> Dict[str, Any]:
+    """Headings and the plain text of the paragraphs, list items and code of the article."""
+    tokens = parse_markdown(blog_markdown)
+    headings: List[tuple] = []  # (level, text)
+    paragraphs: List[str] = []
+    for i, token in enumerate(tokens):
+        if token.type == "inline":
+            text = "".join(" " if child.type in ("softbreak", "hardbreak") else child.content for child in token.children or []).strip()
+            if tokens[i - 1].type == "heading_open":
+                headings.append((int(tokens[i - 1].tag[1]), text))
+            elif text:
+                paragraphs.append(text)
+        elif token.type in ("fence", "code_block"):
+            paragraphs.append(token.content)
+    return {"headings": headings, "paragraphs": paragraphs}
+
+
+def reading_time(word_count: int) -> int:
+    """Minutes at READING_WORDS_PER_MINUTE, rounded up, at least 1."""
+    return max(1, math.ceil(word_count / max(1, settings.READING_WORDS_PER_MINUTE)))
+
+
+def extract_tags(headings: List[str], paragraphs: List[str], limit: int) -> List[str]:
+    """Most frequent content words, with words from headings counting triple. Ties go to the word seen first."""
+    scores: Counter = Counter()
+    first_seen: Dict[str, int] = {}
+    for weight, texts in ((3, headings), (1, paragraphs)):
+        for text in texts:
+            for word in KEYWORD_RE.findall(text.lower().replace("’", "'")):
+                if len(word) < 3 or word in STOPWORDS:
+                    continue
+                scores[word] += weight
+                first_seen.setdefault(word, len(first_seen))
+    ranked = sorted(scores, key=lambda word: (-scores[word], first_seen[word]))
+    return ranked[:limit]
+
+
+def lead_summary(paragraphs: List[str], max_chars: int = 200) -> str:
+    """The article's opening sentences, up to max_chars, cut at a sentence or word boundary."""
+    text = " ".join(" ".join(paragraphs[:3]).split())
+    if len(text) <= max_chars:
+        return text
+    summary = ""
+    for sentence in SENTENCE_END_RE.split(text):
+        if len(summary) + len(sentence) + 1 > max_chars:
+            break
+        summary = f"{summary} {sentence}".strip()
+    if summary:
+        return summary
+    return text[:max_chars - 1].rsplit(" ", 1)[0].rstrip(",;:") + "…"
+
+
+def local_metadata(blog_markdown: str, theme: str = "") -> Dict[str, Any]:
+    """Title, summary, tags, slug, reading time and word/section counts computed from the markdown
+    alone, plus the headings and opening text that METADATA_MODE=polish shows the LM."""
+    outline = _outline(blog_markdown)
+    headings = [text for _, text in outline["headings"]]
+    h1 = next((text for level, text in outline["headings"] if level == 1), "")
+    title = h1 or theme or "Untitled"
+    word_count = len(WORD_RE.findall(" ".join(headings + outline["paragraphs"])))
+    return {
+        "title": title,
+        "summary": lead_summary(outline["paragraphs"]),
+        "tags": extract_tags(headings, outline["paragraphs"], settings.METADATA_MAX_TAGS),
+        "slug": slugify(title),
+        "reading_time": reading_time(word_count),
+        "word_count": word_count,
+        "section_count": sum(level == 2 for level, _ in outline["headings"]),
+        "headings": headings,
+        "lead": " ".join(" ".join(outline["paragraphs"]).split())[:settings.METADATA_LEAD_CHARS],
+    }
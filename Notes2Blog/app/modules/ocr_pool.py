@@ -0,0 +1,140 @@
+from __future__ import annotations
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from ..config import settings
+
+
+def _init_worker() -> None:
+    # Each worker OCRs one image at a time, so keep OpenCV and Tesseract single-threaded
+    # and let the pool spread images across cores instead of oversubscribing them
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    try:
+        import cv2
+        import numpy
+        import pytesseract
+    except ImportError:
+        return  # Reported per image by _ocr_image instead of breaking the pool
+    cv2.setNumThreads(1)
+
+
+def _decode_gray(image: bytes):
+    import cv2
+    import numpy as np
+
+    img = cv2.imdecode(np.frombuffer(image, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError("Could not decode image")
+    return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+
+def _ocr_image(image: bytes, config: str = "") -> str:
+    import pytesseract
+
+    return pytesseract.image_to_string(_decode_gray(image), config=config)
+
+
+def _ocr_lines(image: bytes, config: str = "") -> List[Dict[str, Any]]:
+    """Tesseract's lines in reading order, each with its text, mean word confidence (0-100),
+    bounding box and the paragraph it belongs to."""
+    import pytesseract
+
+    data = pytesseract.image_to_data(_decode_gray(image), config=config, output_type=pytesseract.Output.DICT)
+    lines: Dict[tuple, Dict[str, Any]] = {}
+    for i, word in enumerate(data["text"]):
+        confidence = float(data["conf"][i])
+        if confidence < 0 or not word.strip():
+            continue  # Layout rows (pages, blocks, empty lines) carry conf -1
+        key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        left, top = data["left"][i], data["top"][i]
+        right, bottom = left + data["width"][i], top + data["height"][i]
+        line = lines.setdefault(key, {"words": [], "confidences": [], "box": [left, top, right, bottom]})
+        line["words"].append(word)
+        line["confidences"].append(confidence)
+        box = line["box"]
+        box[:] = [min(box[0], left), min(box[1], top), max(box[2], right), max(box[3], bottom)]
+    return [
+        {
+            "text": " ".join(line["words"]),
+            "confidence": sum(line["confidences"]) / len(line["confidences"]),
+            "box": (line["box"][0], line["box"][1], line["box"][2] - line["box"][0], line["box"][3] - line["box"][1]),
+            "paragraph": key[:2],
+        }
+        for key, line in lines.items()
+    ]
+
+
+class OCRQueueFull(Exception):
+    """Raised when an image waited longer than OCR_QUEUE_TIMEOUT for a free slot in the OCR pool."""
+
+
+class TesseractPool:
+    """Pre-started worker processes for local OCR.
+
+    Decoding and Tesseract run outside the API process, one image per worker, so throughput
+    scales with cores instead of being bound to the calling thread. Images travel to the
+    workers as raw bytes. At most OCR_MAX_PENDING images are queued or running; further
+    callers wait for a slot (up to OCR_QUEUE_TIMEOUT) rather than piling up in memory.
+    """
+
+    def __init__(self, workers: int = None, max_pending: int = None):
+        self.workers = workers or settings.OCR_WORKERS or os.cpu_count() or 1
+        self.max_pending = max_pending or settings.OCR_MAX_PENDING
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self.counters = {"images": 0, "errors": 0, "rejected": 0}
+
+    def start(self) -> None:
+        if self._executor is not None:
+            return
+        with self._lock:
+            if self._executor is not None:
+                return
+            # Spawned, not forked: the API process has warm-up and executor threads that may be
+            # importing modules, and a forked worker would inherit their held import locks
+            executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, mp_context=multiprocessing.get_context("spawn"))
+            # Processes are spawned on demand; submit one no-op per worker so they all exist
+            # (and have imported OpenCV/Tesseract) before the first real image arrives
+            for warm in [executor.submit(os.getpid) for _ in range(self.workers)]:
+                warm.result()
+            self._executor = executor
+
+    def _submit(self, fn, image: bytes, config: str) -> Future:
+        self.start()
+        if not self._slots.acquire(timeout=settings.OCR_QUEUE_TIMEOUT):
+            self.counters["rejected"] += 1
+            raise OCRQueueFull(f"OCR pool busy ({self.max_pending} images pending)")
+        future = self._executor.submit(fn, image, config)
+        future.add_done_callback(self._release)
+        return future
+
+    def submit(self, image: bytes, config: str = "") -> Future:
+        """OCR an image to plain text; the future resolves to a string."""
+        return self._submit(_ocr_image, image, config)
+
+    def submit_lines(self, image: bytes, config: str = "") -> Future:
+        """OCR an image to per-line text with confidences (see _ocr_lines)."""
+        return self._submit(_ocr_lines, image, config)
+
+    def _release(self, future: Future) -> None:
+        self._slots.release()
+        self.counters["errors" if future.cancelled() or future.exception() else "images"] += 1
+
+    def image_to_string(self, image: bytes) -> str:
+        """OCR one encoded image (JPEG/PNG bytes) in the pool, blocking until it is done."""
+        return self.submit(image).result()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counters, "workers": self.workers, "started": self._executor is not None}
+
+
+tesseract_pool = TesseractPool()
@@ -0,0 +1,226 @@
+from __future__ import annotations
+import asyncio
+import concurrent.futures
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from ..config import settings
+from ..metrics import Span, current_span
+
+
+# Rough prompt size used for rate limiting before the real usage is known
+CHARS_PER_TOKEN = 4
+IMAGE_TOKENS = 1000
+
+
+def image_bytes(messages: List[Dict[str, Any]]) -> int:
+    """Size of the inline (data URL) images in a request."""
+    total = 0
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, list):
+            total += sum(len(part["image_url"]["url"]) for part in content if part.get("type") == "image_url")
+    return total
+
+
+def estimate_tokens(messages: List[Dict[str, Any]], max_tokens: Optional[int] = None) -> int:
+    total = 0
+    for message in messages:
+        content = message.get("content") or ""
+        if isinstance(content, str):
+            total += len(content) // CHARS_PER_TOKEN
+            continue
+        for part in content:
+            if part.get("type") == "text":
+                total += len(part.get("text", "")) // CHARS_PER_TOKEN
+            else:
+                total += IMAGE_TOKENS
+    return total + (max_tokens or 0)
+
+
+class TokenBucket:
+    """Continuously refilling budget of `per_minute` units (requests or tokens).
+
+    acquire() waits until enough budget has accumulated instead of failing, so bursts
+    queue up behind the limit rather than turning into 429s.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = float(per_minute) / 60.0
+        self.available = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float) -> None:
+        amount = min(amount, self.capacity)  # A single oversized request must still get through
+        async with self._lock:  # FIFO: later callers wait behind earlier ones
+            while True:
+                self._refill()
+                if self.available >= amount:
+                    self.available -= amount
+                    return
+                await asyncio.sleep((amount - self.available) / self.rate)
+
+    def refund(self, amount: float) -> None:
+        """Give back over-estimated budget (or take more when amount is negative)."""
+        self._refill()
+        self.available = min(self.capacity, self.available + amount)
+
+
+class OpenAIPool:
+    """One AsyncOpenAI client shared by OCR and the DSPy stages.
+
+    The client lives on a private event loop in a background thread, so synchronous callers
+    (graph nodes running in worker threads) can use it through chat() while every request
+    shares the same keep-alive connection pool, concurrency cap and rate limits. A 429
+    pauses all requests for the server's retry-after instead of letting each caller retry
+    on its own.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client = None
+        self._lock = threading.Lock()
+        self._cooldown_until = 0.0
+        self.counters = {"requests": 0, "rate_limited": 0, "retries": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0}
+
+    def start(self, client: Any = None) -> None:
+        """Start the loop and client. `client` replaces the AsyncOpenAI client with any object
+        exposing the same `chat.completions.create` (e.g. an in-process stand-in for benchmarks)."""
+        if self._loop is not None:
+            return
+        with self._lock:
+            if self._loop is not None:
+                return
+            import httpx
+            import openai
+
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="notes2blog-openai", daemon=True).start()
+
+            async def setup():
+                if client is not None:
+                    self._client = client
+                else:
+                    http_client = httpx.AsyncClient(
+                        limits=httpx.Limits(
+                            max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                            max_keepalive_connections=settings.OPENAI_MAX_CONNECTIONS,
+                        ),
+                        timeout=settings.OPENAI_TIMEOUT,
+                    )
+                    self._client = openai.AsyncOpenAI(
+                        api_key=settings.OPENAI_API_KEY or "not-set",
+                        base_url=settings.OPENAI_BASE_URL or None,
+                        http_client=http_client,
+                        max_retries=0,  # Retries are handled here, against the shared limits
+                    )
+                self._concurrency = asyncio.Semaphore(settings.OPENAI_MAX_CONCURRENCY)
+                self._requests = TokenBucket(settings.OPENAI_REQUESTS_PER_MINUTE)
+                self._tokens = TokenBucket(settings.OPENAI_TOKENS_PER_MINUTE)
+
+            asyncio.run_coroutine_threadsafe(setup(), loop).result()
+            self._loop = loop
+
+    async def _wait_for_cooldown(self) -> None:
+        delay = self._cooldown_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _retry_delay(self, error, attempt: int) -> float:
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+            try:
+                return float(headers[header]) * scale
+            except (KeyError, TypeError, ValueError):
+                continue
+        return min(60.0, 2 ** attempt) + random.random()
+
+    async def _request(self, request: Dict[str, Any], on_chunk: Optional[Callable[[Any], None]] = None, span: Optional[Span] = None):
+        import openai
+
+        # span belongs to the graph node that made the call (contextvars do not cross into this loop)
+        record = span.add if span is not None else lambda field, amount=1: None
+        estimate = estimate_tokens(request.get("messages", []), request.get("max_tokens"))
+        sent_image_bytes = image_bytes(request.get("messages", []))
+        async with self._concurrency:
+            for attempt in range(settings.OPENAI_MAX_RETRIES + 1):
+                await self._wait_for_cooldown()
+                await self._requests.acquire(1)
+                await self._tokens.acquire(estimate)
+                self.counters["requests"] += 1
+                record("api_requests")
+                record("image_bytes", sent_image_bytes)
+                try:
+                    if on_chunk is None:
+                        response = await self._client.chat.completions.create(**request)
+                    else:
+                        response = await self._stream(request, on_chunk)
+                except openai.RateLimitError as e:
+                    self.counters["rate_limited"] += 1
+                    # Pause everyone, not just this caller: the limit is shared
+                    self._cooldown_until = max(self._cooldown_until, time.monotonic() + self._retry_delay(e, attempt))
+                except (openai.APIConnectionError, openai.APITimeoutError, openai.InternalServerError) as e:
+                    if attempt == settings.OPENAI_MAX_RETRIES:
+                        self.counters["errors"] += 1
+                        raise
+                    await asyncio.sleep(self._retry_delay(e, attempt))
+                else:
+                    usage = getattr(response, "usage", None)
+                    if usage is not None:
+                        self.counters["prompt_tokens"] += usage.prompt_tokens or 0
+                        self.counters["completion_tokens"] += usage.completion_tokens or 0
+                        record("prompt_tokens", usage.prompt_tokens or 0)
+                        record("completion_tokens", usage.completion_tokens or 0)
+                        self._tokens.refund(estimate - (usage.total_tokens or 0))
+                    return response
+                self.counters["retries"] += 1
+                record("retries")
+            self.counters["errors"] += 1
+            raise RuntimeError(f"OpenAI request still rate limited after {settings.OPENAI_MAX_RETRIES} retries")
+
+    async def _stream(self, request: Dict[str, Any], on_chunk: Callable[[Any], None]):
+        from openai.types.chat import ChatCompletion
+
+        stream = await self._client.chat.completions.create(**request, stream=True, stream_options={"include_usage": True})
+        parts, finish_reason, usage, last = [], "stop", None, None
+        async for chunk in stream:
+            last = chunk
+            usage = chunk.usage or usage
+            if chunk.choices:
+                delta = chunk.choices[0].delta
+                parts.append(delta.content or "")
+                finish_reason = chunk.choices[0].finish_reason or finish_reason
+            on_chunk(chunk)
+        # Reassemble the chunks into the non-streaming response shape callers expect
+        return ChatCompletion(
+            id=last.id if last else "stream",
+            object="chat.completion",
+            created=last.created if last else int(time.time()),
+            model=last.model if last else request.get("model", ""),
+            choices=[{"index": 0, "finish_reason": finish_reason, "message": {"role": "assistant", "content": "".join(parts)}}],
+            usage=usage,
+        )
+
+    def submit(self, request: Dict[str, Any], on_chunk: Optional[Callable[[Any], None]] = None) -> concurrent.futures.Future:
+        """Schedule a chat completion on the shared loop; safe to call from any thread."""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(self._request(request, on_chunk, current_span()), self._loop)
+
+    def chat(self, **request) -> Any:
+        """Blocking chat completion for worker threads. Waits (never fails) while rate limited."""
+        return self.submit(request).result()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counters, "started": self._loop is not None}
+
+
+openai_pool = OpenAIPool()
@@ -0,0 +1,133 @@
+# The one-shot example: an article and the component written for it. It is the demo the React
+# program is compiled with, and REACT_MODE=template reuses its layout. Kept free of imports so
+# the template renderer can load it without DSPy.
+
+REACT_EXAMPLE_MARKDOWN = """# Personal Development and Creative Expression
+
+## Desire to Become a Generalist
+In my quest for personal growth, I have developed a strong desire to become a generalist. This aspiration stems from the belief that having a broad range of skills and knowledge can enhance my adaptability and creativity in various fields.
+
+## Improving Presentation Skills
+To complement my journey as a generalist, I am also focused on improving my presentation skills. Being able to present ideas effectively is crucial in any domain, and I am committed to making myself more presentable in a different way.
+
+## Inspiration from Dwarvesh Patel
+I find inspiration in figures like Dwarvesh Patel, who exemplify the qualities of a generalist. Their ability to navigate multiple disciplines and present ideas in engaging ways motivates me to pursue a similar path.
+
+## Writing on Paper vs. Digital Formats
+I enjoy the tactile experience of writing on paper, but I often wonder about the benefits of recording my thoughts in a digital format. The transition from traditional writing to digital can be challenging, yet it opens up new avenues for sharing and organizing my ideas.
+
+## Concept of a Multi-Modal AI Agent for Note-Taking and Blogging
+One innovative idea I have is to create a multi-modal AI agent that can scan my written notes, reason about how to structure them, and upload them to a digital blog. This concept could bridge the gap between my love for handwritten notes and the efficiency of digital platforms, allowing for a seamless integration of both worlds.
+"""
+
+REACT_EXAMPLE_CODE = '''
+import React from "react";
+import { motion } from "framer-motion";
+
+// Theme: warm off-white background, narrow column, lowercase nav,
+// black body text, strong red accents, minimal chrome.
+
+const ACCENT_RED = "#dc2626";   // Follow this color for the accent red
+const BG_OFFWHITE = "#fffcf8";  // Follow this color for the off-white background
+
+function SiteLayout({ children }) {
+  return (
+    <div className="min-h-screen" style={{ backgroundColor: BG_OFFWHITE, color: "#111827" }}>
+      <TopNav />
+      {children}
+    </div>
+  );
+}
+
+function TopNav() {
+  const items = [
+    { href: "/memo", label: "memo" },
+    { href: "/tech", label: "tech" },
+    { href: "/contact", label: "contact" },
+    { href: "/home", label: "home" },
+    { href: "/books", label: "books" },
+    { href: "/non-technical", label: "non-technical?" },
+  ];
+  return (
+    <header className="sticky top-0 z-30 border-b" style={{ borderColor: "#eee" }}>
+      <nav className="mx-auto max-w-2xl px-4 py-3">
+        <ul className="flex items-center justify-center gap-5 text-[13px] lowercase">
+          {items.map((it) => (
+            <li key={it.href}>
+              <a
+                href={it.href}
+                className="text-neutral-800 hover:text-black underline underline-offset-[6px] decoration-transparent hover:decoration-black transition-colors"
+              >
+                {it.label}
+              </a>
+            </li>
+          ))}
+        </ul>
+      </nav>
+    </header>
+  );
+}
+
+// Article title with slanted gradient "pencil" stroke
+function ArticleTitle({ title }) {
+  return (
+    <section className="text-center pt-6">
+      <h1 className="relative inline-block text-[36px] sm:text-[40px] leading-tight font-semibold lowercase">
+        {title}
+        <span
+          aria-hidden
+          className="pointer-events-none absolute left-0 right-0 -bottom-2 h-3 rotate-[-2deg]"
+          style={{ background: `linear-gradient(90deg, ${ACCENT_RED} 0%, #f87171 100%)`, opacity: 0.85 }}
+        />
+      </h1>
+    </section>
+  );
+}
+
+export default function BlogPost() {
+  return (
+    <SiteLayout>
+      <main className="mx-auto max-w-2xl px-4 py-10">
+        <ArticleTitle title="personal development and creative expression" />
+
+        <article className="mt-14 space-y-10">
+          <section id="desire-to-become-a-generalist">
+            <h2 className="text-xl font-semibold lowercase">desire to become a generalist</h2>
+            <p className="mt-3 text-[15px] leading-7 text-neutral-800">
+              In my quest for personal growth, I have developed a strong desire to become a generalist. This aspiration stems from the belief that having a broad range of skills and knowledge can enhance my adaptability and creativity in various fields.
+            </p>
+          </section>
+
+          <section id="improving-presentation-skills">
+            <h2 className="text-xl font-semibold lowercase">improving presentation skills</h2>
+            <p className="mt-3 text-[15px] leading-7 text-neutral-800">
+              To complement my journey as a generalist, I am also focused on improving my presentation skills. Being able to present ideas effectively is crucial in any domain, and I am committed to making myself more presentable in a different way.
+            </p>
+          </section>
+
+          <section id="inspiration-from-dwarvesh-patel">
+            <h2 className="text-xl font-semibold lowercase">inspiration from dwarvesh patel</h2>
+            <p className="mt-3 text-[15px] leading-7 text-neutral-800">
+              I find inspiration in figures like Dwarvesh Patel, who exemplify the qualities of a generalist. Their ability to navigate multiple disciplines and present ideas in engaging ways motivates me to pursue a similar path.
+            </p>
+          </section>
+
+          <section id="writing-on-paper-vs-digital-formats">
+            <h2 className="text-xl font-semibold lowercase">writing on paper vs. digital formats</h2>
+            <p className="mt-3 text-[15px] leading-7 text-neutral-800">
+              I enjoy the tactile experience of writing on paper, but I often wonder about the benefits of recording my thoughts in a digital format. The transition from traditional writing to digital can be challenging, yet it opens up new avenues for sharing and organizing my ideas.
+            </p>
+          </section>
+
+          <section id="multimodal-ai-agent">
+            <h2 className="text-xl font-semibold lowercase">concept of a multi-modal ai agent for note-taking and blogging</h2>
+            <p className="mt-3 text-[15px] leading-7 text-neutral-800">
+              One innovative idea I have is to create a multi-modal AI agent that can scan my written notes, reason about how to structure them, and upload them to a digital blog. This concept could bridge the gap between my love for handwritten notes and the efficiency of digital platforms, allowing for a seamless integration of both worlds.
+            </p>
+          </section>
+        </article>
+      </main>
+    </SiteLayout>
+  );
+}
+'''
@@ -0,0 +1,152 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import dspy
+
+from ..config import settings
+from .signatures import GenerateReactCode as GenerateReactCodeSignature
+from .pipeline import GenerateReactCode
+from .lm_cache import bypass_cache
+from .react_example import REACT_EXAMPLE_CODE, REACT_EXAMPLE_MARKDOWN
+
+# Bump when the artifact layout changes so old files are recompiled instead of misread
+ARTIFACT_VERSION = 1
+
+BOOTSTRAP_SETTINGS = {
+    "max_bootstrapped_demos": 5,  # Increase for better learning
+    "max_labeled_demos": 3,  # More labeled examples for color consistency
+}
+
+
+def react_style_metric(gold, pred, trace):
+    """More sophisticated metric that checks for style matching"""
+    if not pred.react_code:
+        return 0
+    
+    code = pred.react_code
+    
+    # Basic requirements
+    has_import = "import React" in code
+    has_export = "export default" in code
+    
+    # Style-specific requirements from training example
+    has_motion = "motion" in code or "framer-motion" in code
+    has_correct_red = "#dc2626" in code  # Must use exact red color
+    has_correct_offwhite = "#fffcf8" in code  # Must use exact off-white color
+    has_wrong_colors = "#FF6B6B" in code or "#FAF3E0" in code  # Penalize wrong colors
+    has_layout_components = "SiteLayout" in code or "TopNav" in code
+    has_article_structure = "ArticleTitle" in code or "article" in code
+    has_custom_styling = "className=" in code and len(code) > 1000
+    has_proper_nav_menu_titles = "memo" in code or "tech" in code or "contact" in code or "home" in code or "books" in code or "non-technical" in code
+    
+    # Calculate score based on style complexity - prioritize correct colors
+    style_features = [has_motion, has_correct_red, has_correct_offwhite, has_layout_components, 
+                     has_article_structure, has_custom_styling, has_proper_nav_menu_titles]
+    color_penalty = 0.5 if has_wrong_colors else 0  # Heavy penalty for wrong colors
+    style_score = (sum(style_features) / len(style_features)) - color_penalty
+    
+    # Basic features
+    basic_score = (has_import + has_export) / 2
+    
+    # Weighted final score - prioritize style matching
+    return (basic_score * 0.3) + (style_score * 0.7)
+
+
+def compile_react_with_examples(result: GenerateReactCode) -> GenerateReactCode:
+    """One-shot example that teaches the exact React output style for your article. Use the exact same theme, colors, layout and font as the example."""
+    # Convert to proper DSPy example format
+    training_example = dspy.Example(
+        blog_markdown=REACT_EXAMPLE_MARKDOWN,
+        react_code=REACT_EXAMPLE_CODE
+    ).with_inputs("blog_markdown")
+    
+    print(f"Training example created with colors: {training_example.react_code.count('#dc2626')} instances of #dc2626")
+    print(f"Training example created with colors: {training_example.react_code.count('#fffcf8')} instances of #fffcf8")
+    
+    opt = dspy.BootstrapFewShot(metric=react_style_metric, **BOOTSTRAP_SETTINGS)
+    
+    # Bootstrapping needs real traces, so never serve its calls from the cache
+    with bypass_cache():
+        return opt.compile(result, trainset=[training_example])
+
+
+def program_hash() -> str:
+    """Fingerprint of everything the compiled program depends on: example, signature and optimizer settings."""
+    signature = GenerateReactCodeSignature
+    material = {
+        "version": ARTIFACT_VERSION,
+        "example": [REACT_EXAMPLE_MARKDOWN, REACT_EXAMPLE_CODE],
+        "instructions": signature.instructions,
+        "fields": [[name, str(field.annotation), (field.json_schema_extra or {}).get("desc")] for name, field in signature.fields.items()],
+        "bootstrap": BOOTSTRAP_SETTINGS,
+    }
+    return hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def save_program(program: GenerateReactCode, path: str = None) -> str:
+    path = Path(path or settings.REACT_PROGRAM_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    artifact = {
+        "version": ARTIFACT_VERSION,
+        "hash": program_hash(),
+        "created_at": datetime.now().isoformat(),
+        "state": program.dump_state(),
+    }
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(artifact, f, indent=2, default=str)
+    os.replace(tmp, path)
+    return str(path)
+
+
+def load_program(path: str = None) -> Optional[GenerateReactCode]:
+    """Load the compiled program, or None if the artifact is missing or was built from a different example/signature."""
+    path = Path(path or settings.REACT_PROGRAM_PATH)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            artifact = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if artifact.get("version") != ARTIFACT_VERSION or artifact.get("hash") != program_hash():
+        print(f"⚠️ React program artifact {path} is stale, recompiling")
+        return None
+    program = GenerateReactCode()
+    program.load_state(artifact["state"])
+    return program
+
+
+_program: Optional[GenerateReactCode] = None
+_program_lock = threading.Lock()
+
+
+def get_react_program() -> GenerateReactCode:
+    """Compiled ReactCode program, loaded from its artifact on first use and only recompiled when stale."""
+    global _program
+    with _program_lock:
+        if _program is None:
+            program = load_program()
+            if program is None:
+                program = compile_react_with_examples(GenerateReactCode())
+                print(f"💾 Saved compiled React program to {save_program(program)}")
+            _program = program
+    return _program
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compile the ReactCode program offline and save it as an artifact")
+    parser.add_argument("--force", action="store_true", help="Recompile even if the artifact is up to date")
+    parser.add_argument("--output", default=settings.REACT_PROGRAM_PATH, help="Artifact path")
+    args = parser.parse_args()
+
+    if not args.force and load_program(args.output) is not None:
+        print(f"✅ {args.output} is up to date ({program_hash()[:12]})")
+    else:
+        print(f"💾 Saved compiled React program to {save_program(compile_react_with_examples(GenerateReactCode()), args.output)}")
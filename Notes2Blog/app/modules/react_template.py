@@ -0,0 +1,160 @@
+from __future__ import annotations
+import json
+from typing import Dict, List, Optional
+
+from ..markdown_utils import parse_markdown, slugify
+from .react_example import REACT_EXAMPLE_CODE
+
+# REACT_MODE=template: render blog_markdown into the example's layout in-process instead of
+# asking the LM to reproduce it. Title in ArticleTitle, one <section> per "##" heading with a
+# slugified id, and everything from the markdown AST escaped, so the output always validates.
+
+# Colors, SiteLayout, TopNav and ArticleTitle come straight from the one-shot example
+PREAMBLE = REACT_EXAMPLE_CODE.split("export default function BlogPost()")[0].strip()
+
+CLASSES = {
+    "p": "mt-3 text-[15px] leading-7 text-neutral-800",
+    "h2": "text-xl font-semibold lowercase",
+    "h3": "mt-6 text-lg font-semibold lowercase",
+    "ul": "mt-3 list-disc space-y-1 pl-6 text-[15px] leading-7 text-neutral-800",
+    "ol": "mt-3 list-decimal space-y-1 pl-6 text-[15px] leading-7 text-neutral-800",
+    "blockquote": "mt-3 border-l-4 pl-4 italic text-neutral-700",
+    "pre": "mt-3 overflow-x-auto rounded bg-neutral-100 p-4 text-[13px]",
+    "code": "rounded bg-neutral-100 px-1 text-[13px]",
+    "a": "underline underline-offset-4",
+    "img": "mt-3 rounded",
+    "hr": "my-8 border-neutral-200",
+}
+
+
+def _js(value: str) -> str:
+    """A JavaScript string literal (JSON strings are valid JS)."""
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _text(value: str) -> str:
+    """Text as a JSX child. Characters JSX would parse go in a string expression instead."""
+    if any(char in value for char in "{}<>"):
+        return "{" + _js(value) + "}"
+    return value.replace("&", "&amp;")
+
+
+def _inline(tokens) -> str:
+    out = []
+    for token in tokens or []:
+        kind = token.type
+        if kind in ("text", "html_inline"):
+            out.append(_text(token.content))
+        elif kind == "softbreak":
+            out.append(" ")
+        elif kind == "hardbreak":
+            out.append("<br />")
+        elif kind in ("em_open", "em_close", "strong_open", "strong_close"):
+            out.append(f"<{'/' if token.nesting < 0 else ''}{token.tag}>")
+        elif kind == "code_inline":
+            out.append(f'<code className="{CLASSES["code"]}">{{{_js(token.content)}}}</code>')
+        elif kind == "link_open":
+            out.append(f'<a href={{{_js(token.attrGet("href") or "")}}} className="{CLASSES["a"]}" style={{{{ color: ACCENT_RED }}}}>')
+        elif kind == "link_close":
+            out.append("</a>")
+        elif kind == "image":
+            alt = "".join(child.content for child in token.children or [])
+            out.append(f'<img src={{{_js(token.attrGet("src") or "")}}} alt={{{_js(alt)}}} className="{CLASSES["img"]}" />')
+    return "".join(out).strip()
+
+
+def _plain(tokens) -> str:
+    return "".join(" " if token.type == "softbreak" else token.content for token in tokens or [] if token.type in ("text", "html_inline", "code_inline", "softbreak")).strip()
+
+
+class _Section:
+    def __init__(self, heading: Optional[str], section_id: Optional[str]):
+        self.heading = heading
+        self.id = section_id
+        self.lines: List[str] = []
+
+
+def render_react(blog_markdown: str, title: str = "") -> str:
+    """The BlogPost component for a markdown article, in the example's layout. The first "#"
+    heading is the title (falling back to `title`); each "##" heading starts a section."""
+    tokens = parse_markdown(blog_markdown)
+    sections = [_Section(None, None)]
+    heading_title = None
+    ids: Dict[str, int] = {}
+    depth = 0  # Nesting below the section, for indentation
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        section = sections[-1]
+        indent = "            " + "  " * depth
+        if token.type == "heading_open":
+            inline = tokens[i + 1]
+            if token.tag == "h1" and heading_title is None:
+                heading_title = _plain(inline.children)
+            elif token.tag in ("h1", "h2"):
+                heading = _plain(inline.children)
+                section_id = slugify(heading) or f"section-{len(sections)}"
+                ids[section_id] = ids.get(section_id, 0) + 1
+                if ids[section_id] > 1:
+                    section_id = f"{section_id}-{ids[section_id]}"
+                sections.append(_Section(_inline(inline.children), section_id))
+            else:
+                section.lines.append(f'{indent}<{token.tag} className="{CLASSES["h3"]}">{_inline(inline.children)}</{token.tag}>')
+            i += 3
+            continue
+        if token.type == "inline":
+            section.lines.append(indent + _inline(token.children))
+        elif token.type == "paragraph_open" and not token.hidden:
+            section.lines.append(f'{indent}<p className="{CLASSES["p"]}">' if depth == 0 else f"{indent}<p>")
+            depth += 1
+        elif token.type == "paragraph_close" and not token.hidden:
+            depth -= 1
+            section.lines.append(f"{indent[:-2]}</p>")
+        elif token.type in ("bullet_list_open", "ordered_list_open"):
+            section.lines.append(f'{indent}<{token.tag} className="{CLASSES[token.tag]}">' if depth == 0 else f'{indent}<{token.tag} className="{CLASSES[token.tag].replace("mt-3 ", "")}">')
+            depth += 1
+        elif token.type == "list_item_open":
+            section.lines.append(f"{indent}<li>")
+            depth += 1
+        elif token.type == "blockquote_open":
+            section.lines.append(f'{indent}<blockquote className="{CLASSES["blockquote"]}" style={{{{ borderColor: ACCENT_RED }}}}>')
+            depth += 1
+        elif token.type in ("bullet_list_close", "ordered_list_close", "list_item_close", "blockquote_close"):
+            depth -= 1
+            section.lines.append(f"{indent[:-2]}</{token.tag}>")
+        elif token.type in ("fence", "code_block"):
+            section.lines.append(f'{indent}<pre className="{CLASSES["pre"]}"><code>{{{_js(token.content.rstrip(chr(10)))}}}</code></pre>')
+        elif token.type == "html_block":
+            section.lines.append(f'{indent}<p className="{CLASSES["p"]}">{_text(token.content.strip())}</p>')
+        elif token.type == "hr":
+            section.lines.append(f'{indent}<hr className="{CLASSES["hr"]}" />')
+        i += 1
+
+    body = []
+    for section in sections:
+        if section.heading is None and not section.lines:
+            continue
+        body.append(f'          <section id="{section.id}">' if section.id else "          <section>")
+        if section.heading is not None:
+            body.append(f'            <h2 className="{CLASSES["h2"]}">{section.heading}</h2>')
+        body.extend(section.lines)
+        body.append("          </section>")
+        body.append("")
+    return "\n".join([
+        PREAMBLE,
+        "",
+        "export default function BlogPost() {",
+        "  return (",
+        "    <SiteLayout>",
+        '      <main className="mx-auto max-w-2xl px-4 py-10">',
+        f"        <ArticleTitle title={{{_js(heading_title or title or 'untitled')}}} />",
+        "",
+        '        <article className="mt-14 space-y-10">',
+        *body[:-1],
+        "        </article>",
+        "      </main>",
+        "    </SiteLayout>",
+        "  );",
+        "}",
+        "",
+    ])
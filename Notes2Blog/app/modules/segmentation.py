@@ -0,0 +1,94 @@
+from __future__ import annotations
+from typing import List, Tuple
+
+# Layout analysis runs on a copy scaled down to this many pixels on the long side;
+# the crops themselves are cut from the full-resolution page
+ANALYSIS_SIZE = 1600
+PADDING = 12  # Pixels of margin kept around each region at full resolution
+
+Box = Tuple[int, int, int, int]  # x, y, width, height
+
+
+def _line_bands(binary) -> List[Box]:
+    """Horizontal bands that each hold one line of text, top to bottom."""
+    import cv2
+
+    height, width = binary.shape
+    # Smear ink sideways so the letters and words of a line merge into one blob
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (max(15, width // 40), 3))
+    smeared = cv2.dilate(binary, kernel, iterations=1)
+    contours, _ = cv2.findContours(smeared, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    min_area = (width * height) // 5000
+    boxes = sorted((b for b in map(cv2.boundingRect, contours) if b[2] * b[3] >= min_area and b[3] >= 6), key=lambda b: b[1])
+
+    bands: List[List[int]] = []  # [x0, y0, x1, y1]
+    for x, y, w, h in boxes:
+        # Blobs that overlap vertically belong to the same line (e.g. a word and its underline)
+        if bands and y < bands[-1][3]:
+            band = bands[-1]
+            band[0], band[2], band[3] = min(band[0], x), max(band[2], x + w), max(band[3], y + h)
+        else:
+            bands.append([x, y, x + w, y + h])
+    return [(x0, y0, x1 - x0, y1 - y0) for x0, y0, x1, y1 in bands]
+
+
+def _group(bands: List[Box], max_regions: int) -> List[Box]:
+    """Merge neighbouring lines into at most max_regions strips of similar height."""
+    strips = [list(band) for band in bands]
+    while len(strips) > max_regions:
+        # Merge the pair that yields the shortest strip, so the work is spread evenly
+        heights = [strips[i + 1][1] + strips[i + 1][3] - strips[i][1] for i in range(len(strips) - 1)]
+        i = heights.index(min(heights))
+        upper, lower = strips[i], strips.pop(i + 1)
+        x0, x1 = min(upper[0], lower[0]), max(upper[0] + upper[2], lower[0] + lower[2])
+        upper[:] = [x0, upper[1], x1 - x0, lower[1] + lower[3] - upper[1]]
+    return [tuple(strip) for strip in strips]
+
+
+def segment_page(image: bytes, max_regions: int, quality: int = 90) -> List[bytes]:
+    """Split a page of notes into text strips, returned as JPEG crops in reading order.
+
+    Lines are found with an adaptive threshold and a horizontal dilation on a downscaled
+    copy, grouped into at most max_regions strips, and cropped from the original
+    resolution so small handwriting keeps all its detail. Reading order is top to bottom,
+    which fits single-column notebook pages. Returns [] when no text is found.
+    """
+    import cv2
+    import numpy as np
+
+    page = cv2.imdecode(np.frombuffer(image, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+    if page is None:
+        raise ValueError("Could not decode image")
+    height, width = page.shape
+    scale = min(1.0, ANALYSIS_SIZE / max(height, width))
+    small = cv2.resize(page, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1.0 else page
+    binary = cv2.adaptiveThreshold(small, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV, 31, 15)
+
+    crops = []
+    for x, y, w, h in _group(_line_bands(binary), max_regions):
+        x0, y0 = max(0, int(x / scale) - PADDING), max(0, int(y / scale) - PADDING)
+        x1, y1 = min(width, int((x + w) / scale) + PADDING), min(height, int((y + h) / scale) + PADDING)
+        ok, encoded = cv2.imencode(".jpg", page[y0:y1, x0:x1], [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if ok:
+            crops.append(encoded.tobytes())
+    return crops
+
+
+def crop_regions(image: bytes, boxes: List[Box], quality: int = 90) -> List[bytes]:
+    """Cut boxes (in the image's own pixel coordinates) out of an image as JPEG crops."""
+    import cv2
+    import numpy as np
+
+    page = cv2.imdecode(np.frombuffer(image, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if page is None:
+        raise ValueError("Could not decode image")
+    height, width = page.shape[:2]
+    crops = []
+    for x, y, w, h in boxes:
+        x0, y0 = max(0, x - PADDING), max(0, y - PADDING)
+        x1, y1 = min(width, x + w + PADDING), min(height, y + h + PADDING)
+        ok, encoded = cv2.imencode(".jpg", page[y0:y1, x0:x1], [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ok:
+            raise ValueError(f"Could not encode region {(x, y, w, h)}")
+        crops.append(encoded.tobytes())
+    return crops
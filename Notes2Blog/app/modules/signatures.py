@@ -31,6 +31,13 @@ class GenerateBlog(dspy.Signature):
     outline: List[str] = dspy.InputField(desc="Key points for the blog post")
     blog_markdown: str = dspy.OutputField(desc="Complete blog post in markdown format")
 
+class ThemeOutlineAndBlog(dspy.Signature):
+    """Find the theme and outline of the text transcript, then write a blog post article in markdown format from them. Do not deviate from the text: the outline should be the points as they appear in the text, and the blog should be a single article containing only what is in the text."""
+    raw_text: str = dspy.InputField(desc="Raw text extracted from notes")
+    theme: str = dspy.OutputField(desc="Main theme or topic of the notes. Extract the main heading or topic")
+    outline: List[str] = dspy.OutputField(desc="List of key points exactly as they appear in the text")
+    blog_markdown: str = dspy.OutputField(desc="Complete blog post in markdown format")
+
 class GenerateReactCode(dspy.Signature):
     """Generate a sophisticated React component with custom styling, layout components, and modern design patterns. 
     
@@ -57,11 +64,36 @@ class GenerateBlogMetadata(dspy.Signature):
     title: str = dspy.OutputField(desc="SEO-friendly title for the blog post")
     summary: str = dspy.OutputField(desc="Brief summary (150-200 chars) for preview")
     tags: List[str] = dspy.OutputField(desc="Relevant tags for categorization")
-    slug: str = dspy.OutputField(desc="URL-friendly slug for the blog post")
-    reading_time: int = dspy.OutputField(desc="Estimated reading time in minutes")
+
+class PolishMetadata(dspy.Signature):
+    """Polish the title and write the preview summary of a blog post from its draft title, headings and opening text."""
+    draft_title: str = dspy.InputField(desc="Title taken from the post's first heading")
+    headings: List[str] = dspy.InputField(desc="Section headings of the post")
+    lead: str = dspy.InputField(desc="Opening text of the post")
+    title: str = dspy.OutputField(desc="SEO-friendly title, at most 70 characters")
+    summary: str = dspy.OutputField(desc="Brief summary (150-200 chars) for preview")
 
 class ImproveFromFeedback(dspy.Signature):
     """Using the feedback, improve the blog post article in markdown format."""
     feedback: str = dspy.InputField(desc="Feedback or validation errors to address")
     react_code: str = dspy.InputField(desc="Current React code that needs improvement")
     improved_react_code: str = dspy.OutputField(desc="Improved React code based on feedback")
+
+class RepairReactCode(dspy.Signature):
+    """Fix the validation errors in a React component by editing only the lines that need to change.
+
+    You see numbered excerpts of the component around the failing lines, not the whole file.
+    Answer with one or more search/replace hunks and nothing else:
+
+    <<<<<<< SEARCH
+    exact lines copied from the excerpts, without the line numbers
+    =======
+    the corrected lines
+    >>>>>>> REPLACE
+
+    Each SEARCH block must match the current code exactly and only once; include a neighbouring
+    line if needed to make it unique. Keep hunks small and do not rewrite unrelated code.
+    """
+    feedback: str = dspy.InputField(desc="Validation errors to fix, with line and column numbers")
+    code_excerpts: str = dspy.InputField(desc="Numbered lines of the current React code around the errors; '...' marks omitted lines")
+    patch: str = dspy.OutputField(desc="SEARCH/REPLACE hunks that fix the errors")
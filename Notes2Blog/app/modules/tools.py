@@ -1,78 +1,175 @@
 import os 
 import base64
-import openai
+import logging
 import dspy
+from typing import Dict, List
 from tenacity import retry, stop_after_attempt, wait_exponential
-import pytesseract
-import cv2
-import numpy as np
 
 from ..config import settings
+from .openai_pool import openai_pool
+from .ocr_pool import tesseract_pool
+from .segmentation import crop_regions, segment_page
+
+logger = logging.getLogger(__name__)
 
 class OCRTool:
-    def __init__(self):
-        if settings.USE_OPENAI_VISION and settings.OPENAI_API_KEY:
-            self.vision_client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
-        else:
-            self.vision_client = None
+    # Vision requests go through the shared OpenAI pool and Tesseract runs in a worker-process
+    # pool; both start on first use, so importing the pipeline stays cheap and free of side effects.
+    @property
+    def use_vision(self) -> bool:
+        return bool(settings.USE_OPENAI_VISION and settings.OPENAI_API_KEY)
+
+    @property
+    def use_hybrid(self) -> bool:
+        return bool(settings.OCR_HYBRID and self.use_vision)
+
+    @property
+    def backend(self) -> str:
+        """Identifies which engine/model produces the text, e.g. for cache keys."""
+        if self.use_hybrid:
+            return f"hybrid:{settings.OPENAI_VISION_MODEL}:c{settings.OCR_HYBRID_MIN_CONFIDENCE:g}"
+        if self.use_vision:
+            return f"vision:{settings.OPENAI_VISION_MODEL}"
+        return "tesseract"
+
+    def warm_up(self) -> None:
+        """Build the client or import the local OCR stack ahead of the first request."""
+        if self.use_vision:
+            openai_pool.start()
+        if self.use_hybrid or not self.use_vision:
+            tesseract_pool.start()
 
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=1, max=10))
-    def forward(self, image_b64: str) -> dict:
+    def forward(self, image: bytes) -> dict:
         try:
-            if self.vision_client:
-                result = self._vision(image_b64)
+            if self.use_hybrid:
+                return {"raw text": self._hybrid(image)}
+            if self.use_vision:
+                result = self._vision(image)
                 return {"raw text": result}
             else:
-                result = self._tesseract(image_b64)
+                result = self._tesseract(image)
                 return {"raw text": result}
         except Exception as e:
             print(f"OCR Error: {str(e)}")
             # Fallback to empty string if both methods fail
             return {"raw text": ""}
 
-    def _vision(self, image_b64: str) -> str:
-        # Detect image format from base64 header or default to jpeg
-        import base64
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=1, max=10))
+    def forward_tiled(self, image: bytes) -> dict:
+        """OCR a full-resolution page strip by strip, all strips at once, and join the text in reading order."""
         try:
-            image_data = base64.b64decode(image_b64[:100])  # Just check header
-            if image_data.startswith(b'\x89PNG'):
-                mime_type = "image/png"
-            elif image_data.startswith(b'\xFF\xD8\xFF'):
-                mime_type = "image/jpeg"
-            elif image_data.startswith(b'GIF'):
-                mime_type = "image/gif"
-            elif image_data.startswith(b'RIFF') and b'WEBP' in image_data:
-                mime_type = "image/webp"
+            regions = segment_page(image, settings.OCR_TILE_MAX_REGIONS, settings.IMAGE_QUALITY) or [image]
+            if self.use_vision:
+                futures = [openai_pool.submit(self._vision_request(region)) for region in regions]
+                texts = [future.result().choices[0].message.content.strip() for future in futures]
             else:
-                mime_type = "image/jpeg"  # Default fallback
-        except:
-            mime_type = "image/jpeg"  # Fallback if detection fails
-            
+                # --psm 6: each strip is a uniform block of text
+                futures = [tesseract_pool.submit(region, config="--psm 6") for region in regions]
+                texts = [future.result().strip() for future in futures]
+            return {"raw text": "\n".join(text for text in texts if text)}
+        except Exception as e:
+            print(f"OCR Error: {str(e)}")
+            return {"raw text": ""}
+
+    def _vision_request(self, image: bytes, prompt: str = "Extract all readable text from this photo.") -> dict:
+        # Detect image format from the file header or default to jpeg
+        if image.startswith(b'\x89PNG'):
+            mime_type = "image/png"
+        elif image.startswith(b'\xFF\xD8\xFF'):
+            mime_type = "image/jpeg"
+        elif image.startswith(b'GIF'):
+            mime_type = "image/gif"
+        elif image.startswith(b'RIFF') and b'WEBP' in image[:16]:
+            mime_type = "image/webp"
+        else:
+            mime_type = "image/jpeg"  # Default fallback
+
+        # The API takes images inline, so this is the one place they are base64 encoded
+        image_b64 = base64.b64encode(image).decode("utf-8")
         image_url = f"data:{mime_type};base64,{image_b64}"
+        return dict(
+            model=settings.OPENAI_VISION_MODEL,
+            messages=[
+                {"role": "system", "content": "You are an OCR engine. Extract text faithfully."},
+                {
+                "role": "user",
+                "content": [
+                {"type": "text", "text": prompt},
+                {"type": "image_url", "image_url": {"url": image_url}},
+                ],
+                },
+                ],
+            temperature=0,
+        )
+
+    def _vision(self, image: bytes) -> str:
         try:
-            response = self.vision_client.chat.completions.create(
-                model=settings.OPENAI_VISION_MODEL,
-                messages=[
-                    {"role": "system", "content": "You are an OCR engine. Extract text faithfully."},
-                    {
-                    "role": "user",
-                    "content": [
-                    {"type": "text", "text": "Extract all readable text from this photo."},
-                    {"type": "image_url", "image_url": {"url": image_url}},
-                    ],
-                    },
-                    ],
-                temperature=0,
-            )
+            response = openai_pool.chat(**self._vision_request(image))
             return response.choices[0].message.content.strip()
         except Exception as e:
-            return f"Vision Error: {str(e)} + This was the final image url: {image_url}"
-
-    def _tesseract(self, image_b64: str) -> str:
-        if pytesseract is None or cv2 is None:
-            return "" # Graceful fallback
-        data = base64.b64decode(image_b64)
-        img_arr = np.frombuffer(data, dtype=np.uint8)
-        img = cv2.imdecode(img_arr, cv2.IMREAD_COLOR)
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        return pytesseract.image_to_string(gray)     
\ No newline at end of file
+            return f"Vision Error: {str(e)} ({len(image)} bytes)"
+
+    def _hybrid(self, image: bytes) -> str:
+        """Tesseract first; only lines it is unsure about are cropped and sent to the vision model."""
+        lines = tesseract_pool.submit_lines(image).result()
+        if not lines:
+            # Nothing Tesseract could read at all (faint or heavily handwritten page)
+            logger.info("Hybrid OCR: no lines found locally, using vision for the whole page")
+            return self._vision(image)
+        weak = [i for i, line in enumerate(lines) if line["confidence"] < settings.OCR_HYBRID_MIN_CONFIDENCE]
+        if not weak:
+            logger.info("Hybrid OCR: all %d lines read locally", len(lines))
+            return self._join_lines(lines, {})
+
+        # Runs of consecutive weak lines within a paragraph become one crop each
+        groups: List[List[int]] = []
+        for i in weak:
+            if groups and groups[-1][-1] == i - 1 and lines[i - 1]["paragraph"] == lines[i]["paragraph"]:
+                groups[-1].append(i)
+            else:
+                groups.append([i])
+        if len(weak) > settings.OCR_HYBRID_MAX_WEAK_FRACTION * len(lines) or len(groups) > settings.OCR_HYBRID_MAX_REGIONS:
+            # Mostly unreadable locally: one full-page request beats many small ones
+            logger.info("Hybrid OCR: %d/%d lines below confidence, using vision for the whole page", len(weak), len(lines))
+            return self._vision(image)
+
+        boxes = []
+        for group in groups:
+            x0 = min(lines[i]["box"][0] for i in group)
+            y0 = min(lines[i]["box"][1] for i in group)
+            x1 = max(lines[i]["box"][0] + lines[i]["box"][2] for i in group)
+            y1 = max(lines[i]["box"][1] + lines[i]["box"][3] for i in group)
+            boxes.append((x0, y0, x1 - x0, y1 - y0))
+        prompt = "Transcribe the handwritten text in this image exactly. Reply with the text only."
+        futures = [openai_pool.submit(self._vision_request(crop, prompt)) for crop in crop_regions(image, boxes, settings.IMAGE_QUALITY)]
+        replacements = {}
+        for group, future in zip(groups, futures):
+            try:
+                replacements[group[0]] = (group, future.result().choices[0].message.content.strip())
+            except Exception as e:
+                logger.warning("Hybrid OCR: vision failed for a region, keeping Tesseract's text: %s", e)
+        logger.info("Hybrid OCR: %d/%d lines sent to vision in %d regions", len(weak), len(lines), len(groups))
+        return self._join_lines(lines, replacements)
+
+    @staticmethod
+    def _join_lines(lines: List[dict], replacements: Dict[int, tuple]) -> str:
+        # Rebuild the page text line by line, swapping in vision text for the weak regions
+        out, skip, paragraph = [], set(), None
+        for i, line in enumerate(lines):
+            if i in skip:
+                continue
+            if paragraph is not None and line["paragraph"] != paragraph:
+                out.append("")
+            paragraph = line["paragraph"]
+            if i in replacements:
+                group, text = replacements[i]
+                skip.update(group)
+                out.append(text)
+            else:
+                out.append(line["text"])
+        return "\n".join(out)
+
+    def _tesseract(self, image: bytes) -> str:
+        # Runs in the warm worker-process pool rather than on the calling thread
+        return tesseract_pool.image_to_string(image)
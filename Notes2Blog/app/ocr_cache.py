@@ -0,0 +1,146 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from .config import settings
+
+
+class OCRCache:
+    """Content-addressed cache for OCR results.
+
+    Entries are keyed by a SHA-256 of the normalized (compressed) image bytes plus
+    the OCR backend, so the same photo is only transcribed once per backend/model.
+    Lookups go through an in-memory LRU first and fall back to JSON files under
+    OUTPUT_DIR/cache/ocr, which survive restarts and are shared between workers.
+    """
+
+    def __init__(self, cache_dir: str = None, memory_items: int = None, disk_max_bytes: int = None, ttl_seconds: int = None):
+        self.cache_dir = Path(cache_dir or Path(settings.OUTPUT_DIR) / "cache" / "ocr")
+        self.memory_items = memory_items if memory_items is not None else settings.OCR_CACHE_MEMORY_ITEMS
+        self.disk_max_bytes = disk_max_bytes if disk_max_bytes is not None else settings.OCR_CACHE_DISK_MAX_BYTES
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.OCR_CACHE_TTL_SECONDS
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._disk_bytes: Optional[int] = None
+        self._lock = threading.Lock()
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    @staticmethod
+    def key(image_bytes: bytes, backend: str) -> str:
+        digest = hashlib.sha256(image_bytes).hexdigest()
+        return hashlib.sha256(f"{backend}:{digest}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl_seconds > 0 and time.time() - created_at > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[0]):
+                    self._memory.move_to_end(key)
+                    self.counters["memory_hits"] += 1
+                    return entry[1]
+                del self._memory[key]
+
+            path = self._path(key)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = None
+            if data is not None and not self._expired(data.get("created_at", 0)):
+                os.utime(path)  # Touch so disk eviction is least-recently-used
+                self._remember(key, data["created_at"], data["text"])
+                self.counters["disk_hits"] += 1
+                return data["text"]
+            if data is not None:
+                self._remove(path)
+
+            self.counters["misses"] += 1
+            return None
+
+    def put(self, key: str, text: str, backend: str = "") -> None:
+        created_at = time.time()
+        payload = json.dumps({"text": text, "backend": backend, "created_at": created_at})
+        path = self._path(key)
+        with self._lock:
+            self._remember(key, created_at, text)
+            usage = self._disk_usage()
+            if path.exists():
+                usage -= path.stat().st_size
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp, path)
+            self.counters["writes"] += 1
+            self._disk_bytes = usage + path.stat().st_size
+            self._evict_disk()
+
+    def _remember(self, key: str, created_at: float, text: str) -> None:
+        self._memory[key] = (created_at, text)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _entries(self):
+        if not self.cache_dir.exists():
+            return []
+        return list(self.cache_dir.glob("*/*.json"))
+
+    def _disk_usage(self) -> int:
+        # Scan once, then keep a running total updated by writes and evictions
+        if self._disk_bytes is None:
+            self._disk_bytes = sum(p.stat().st_size for p in self._entries())
+        return self._disk_bytes
+
+    def _remove(self, path: Path) -> None:
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except OSError:
+            return
+        if self._disk_bytes is not None:
+            self._disk_bytes -= size
+        self.counters["evictions"] += 1
+
+    def _evict_disk(self) -> None:
+        if self._disk_bytes is None or self._disk_bytes <= self.disk_max_bytes:
+            return
+        # Oldest access first; rescan so entries written by other workers are counted too
+        entries = []
+        for p in self._entries():
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        entries.sort()
+        self._disk_bytes = sum(size for _, size, _ in entries)
+        for _, _, path in entries:
+            if self._disk_bytes <= self.disk_max_bytes:
+                break
+            self._remove(path)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            lookups = self.counters["memory_hits"] + self.counters["disk_hits"] + self.counters["misses"]
+            hits = self.counters["memory_hits"] + self.counters["disk_hits"]
+            return {
+                **self.counters,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_items": len(self._memory),
+                "disk_bytes": self._disk_usage(),
+            }
+
+
+ocr_cache = OCRCache()
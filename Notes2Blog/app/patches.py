@@ -0,0 +1,102 @@
+from __future__ import annotations
+import re
+from typing import List, Set, Tuple
+
+from .validators import MISSING_COLOR, MISSING_EXPORT
+
+# Search/replace patches for repairing generated React code. The LM sees only the lines the
+# validator complained about and answers with hunks in this format, applied here locally:
+#
+#   <<<<<<< SEARCH
+#   exact lines from the current code
+#   =======
+#   replacement lines
+#   >>>>>>> REPLACE
+
+HUNK_RE = re.compile(r"^<{5,} ?SEARCH[^\n]*\n(.*?)^={5,}[^\n]*\n(.*?)^>{5,} ?REPLACE[^\n]*$", re.M | re.S)
+LINE_REF_RE = re.compile(r"\b[Ll]ine (\d+)|\bat (\d+):\d+")
+NUMBERED_RE = re.compile(r"^\s*\d+\s?\| ?", re.M)
+COMPONENT_RE = re.compile(r"^\s*(?:export\s+)?(?:default\s+)?(?:function\s+[A-Z]\w*|const\s+[A-Z]\w*\s*=)", re.M)
+HEAD_LINES = 12  # Imports and color constants live at the top of the file
+# Validator problems without a line number, which are fixed at the top of the file or the component declaration
+HEAD_PROBLEMS = (MISSING_EXPORT, MISSING_COLOR.split("{")[0])
+
+
+class PatchError(ValueError):
+    pass
+
+
+def failing_lines(code: str, feedback: str) -> Set[int]:
+    """1-based line numbers the validator feedback points at. A missing export or color constant
+    points at the top of the file and the component declaration. Other feedback without line
+    numbers (e.g. a reviewer's note) gives no lines, so the caller regenerates instead."""
+    lines = {int(a or b) for a, b in LINE_REF_RE.findall(feedback)}
+    if any(problem.strip().startswith(HEAD_PROBLEMS) for problem in feedback.splitlines()):
+        lines.update(range(1, HEAD_LINES + 1))
+        lines.update(code.count("\n", 0, match.start()) + 1 for match in COMPONENT_RE.finditer(code))
+    total = code.count("\n") + 1
+    return {line for line in lines if 1 <= line <= total}
+
+
+def excerpt(code: str, lines: Set[int], context: int) -> str:
+    """The given lines plus `context` lines around each, numbered, with gaps marked by '...'."""
+    source = code.splitlines()
+    keep = sorted({n for line in lines for n in range(line - context, line + context + 1) if 1 <= n <= len(source)})
+    parts, previous = [], 0
+    for n in keep:
+        if n != previous + 1:
+            parts.append("...")
+        parts.append(f"{n:>4}| {source[n - 1]}")
+        previous = n
+    if keep and keep[-1] != len(source):
+        parts.append("...")
+    return "\n".join(parts)
+
+
+def parse_hunks(patch: str) -> List[Tuple[str, str]]:
+    hunks = []
+    for search, replace in HUNK_RE.findall(patch or ""):
+        # Models sometimes copy the excerpt's line numbers into the hunk
+        if search.strip() and all(NUMBERED_RE.match(line) for line in search.splitlines() if line.strip()):
+            search, replace = NUMBERED_RE.sub("", search), NUMBERED_RE.sub("", replace)
+        hunks.append((search, replace))
+    if not hunks:
+        raise PatchError("No SEARCH/REPLACE hunks in the patch")
+    return hunks
+
+
+def _find(code: str, search: str) -> Tuple[int, int]:
+    """Span of `search` in `code`: an exact unique match, else a unique match ignoring indentation and trailing spaces."""
+    if code.count(search) == 1:
+        start = code.index(search)
+        return start, start + len(search)
+    if code.count(search) > 1:
+        raise PatchError(f"SEARCH block matches {code.count(search)} places: {search.strip()[:80]!r}")
+    wanted = [line.strip() for line in search.strip("\n").splitlines()]
+    source = code.splitlines(keepends=True)
+    stripped = [line.strip() for line in source]
+    matches = [i for i in range(len(source) - len(wanted) + 1) if stripped[i:i + len(wanted)] == wanted]
+    if len(matches) != 1:
+        problem = "matches several places" if matches else "was not found in the code"
+        raise PatchError(f"SEARCH block {problem}: {search.strip()[:80]!r}")
+    start = sum(len(line) for line in source[:matches[0]])
+    end = start + sum(len(line) for line in source[matches[0]:matches[0] + len(wanted)])
+    if search.endswith("\n") or not source[matches[0] + len(wanted) - 1].endswith("\n"):
+        return start, end
+    return start, end - 1  # Keep the newline after the matched block
+
+
+def apply_hunks(code: str, hunks: List[Tuple[str, str]]) -> str:
+    """Apply search/replace hunks in order. Raises PatchError if any SEARCH block cannot be located.
+    CRLF code is patched as LF and converted back, whatever line endings the hunks use."""
+    crlf = "\r\n" in code
+    code = code.replace("\r\n", "\n")
+    for search, replace in hunks:
+        search, replace = search.replace("\r\n", "\n"), replace.replace("\r\n", "\n")
+        if not search.strip():
+            raise PatchError("Empty SEARCH block")
+        start, end = _find(code, search)
+        if search.endswith("\n") and replace and not replace.endswith("\n"):
+            replace += "\n"
+        code = code[:start] + replace + code[end:]
+    return code.replace("\n", "\r\n") if crlf else code
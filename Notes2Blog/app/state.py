@@ -1,8 +1,10 @@
-from typing import TypedDict, Optional, List, Dict, Any
+import operator
+from typing import Annotated, TypedDict, Optional, List, Dict, Any
 
 class State(TypedDict, total=False):
+    job_id: str  # Set by JobManager; names the job's artifact directory
     image_path: str
-    image_b64: str
+    image_bytes: bytes  # Compressed image; loaded from image_path when not given
     raw_text: str
     theme: str
     outline: List[str]
@@ -10,12 +12,29 @@ class State(TypedDict, total=False):
     react_code: str
     feedback: str
     validated: bool
-    logs: List[str]
+    logs: Annotated[List[str], operator.add]  # Appended to by every node, so parallel branches can log
+    trace: Annotated[List[Dict[str, Any]], operator.add]  # One entry per node run: wall time, LM calls, tokens, cache hits
     errors: Optional[str]
     retry_count: int
+    no_cache: bool
+    resume_from: str  # Node a resumed run starts at (POST /jobs/{id}/resume); upstream results come from the checkpoint
+    stream_tokens: bool  # Stream blog_markdown tokens to the client (POST /process/stream)
+    react_mode: str  # Per-job override of settings.REACT_MODE
     # Metadata fields
     title: str
     summary: str
     tags: List[str]
     slug: str
     reading_time: int
+    word_count: int
+    section_count: int
+    artifact_dir: str
+
+
+# Nodes a job can be resumed at, and the fields a resume request may edit; everything else is
+# taken from the job's checkpoint. Resuming at improve_from_feedback with new feedback costs one LM call.
+RESUME_NODES = ("ocr", "reason", "generate_blog", "generate_metadata", "generate_react", "improve_from_feedback")
+RESUME_FIELDS = ("raw_text", "theme", "outline", "blog_markdown", "react_code", "feedback", "title", "summary", "tags", "slug", "reading_time", "react_mode")
+
+# "template" renders the article into the example layout without the LM; "creative" asks the LM for the component
+REACT_MODES = ("template", "creative")
@@ -1,22 +1,75 @@
+import asyncio
 import base64
+import hashlib
+import os
 import uuid
 from pathlib import Path
 from .config import settings
-from typing import Tuple
+from typing import Awaitable, Callable, Optional, Tuple
 from PIL import Image
 import io
 
 
-Path(settings.UPLOAD_DIR).mkdir(parents=True, exist_ok=True)
-Path(settings.OUTPUT_DIR).mkdir(parents=True, exist_ok=True)
+def ensure_dirs() -> None:
+    Path(settings.UPLOAD_DIR).mkdir(parents=True, exist_ok=True)
+    Path(settings.OUTPUT_DIR).mkdir(parents=True, exist_ok=True)
+
+class UploadTooLarge(Exception):
+    """Raised when an upload is bigger than MAX_FILE_SIZE."""
+
+def _upload_ext(file: str) -> str:
+    return Path(file).suffix.lower() or ".bin"
+
+def find_upload(digest: str) -> Optional[str]:
+    """Name of an already stored upload with this SHA-256, if any (whatever its extension)."""
+    for path in Path(settings.UPLOAD_DIR).glob(f"{digest}.*"):
+        return path.name
+    return None
+
+def _store_upload(tmp: Path, digest: str, ext: str) -> Tuple[str, bool]:
+    # Uploads are named by content hash, so the same photo is only ever kept once
+    existing = find_upload(digest)
+    if existing is not None:
+        tmp.unlink(missing_ok=True)
+        return existing, True
+    safe = f"{digest}{ext}"
+    os.replace(tmp, Path(settings.UPLOAD_DIR) / safe)
+    return safe, False
 
 def save_upload(file: str, content: bytes) -> str:
-    ext = Path(file).suffix or ".bin"
-    safe = f"{uuid.uuid4().hex}{ext}"
-    path = Path(settings.UPLOAD_DIR) / safe
-    with open(path, "wb") as f:
+    ensure_dirs()
+    digest = hashlib.sha256(content).hexdigest()
+    tmp = Path(settings.UPLOAD_DIR) / f".{uuid.uuid4().hex}.tmp"
+    with open(tmp, "wb") as f:
         f.write(content)
-    return safe
+    return _store_upload(tmp, digest, _upload_ext(file))[0]
+
+def _write_chunk(f, digest, chunk: bytes) -> None:
+    digest.update(chunk)
+    f.write(chunk)
+
+async def save_upload_stream(file: str, read: Callable[[int], Awaitable[bytes]], max_bytes: int = None) -> Tuple[str, bool]:
+    """Stream an upload to disk chunk by chunk, hashing as it goes.
+
+    read(n) returns the next chunk (b"" at the end), e.g. UploadFile.read. Memory use stays
+    at one chunk whatever the file size. Hashing and disk writes run in a worker thread so
+    they never block the event loop. Returns the stored name and whether it was a duplicate.
+    """
+    await asyncio.to_thread(ensure_dirs)
+    max_bytes = max_bytes or settings.MAX_FILE_SIZE
+    digest, size = hashlib.sha256(), 0
+    tmp = Path(settings.UPLOAD_DIR) / f".{uuid.uuid4().hex}.tmp"
+    try:
+        f = await asyncio.to_thread(open, tmp, "wb")
+        with f:
+            while chunk := await read(settings.UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds the {max_bytes} byte limit")
+                await asyncio.to_thread(_write_chunk, f, digest, chunk)
+        return await asyncio.to_thread(_store_upload, tmp, digest.hexdigest(), _upload_ext(file))
+    finally:
+        tmp.unlink(missing_ok=True)
 
 def save_output(file: str, content: str, subdir: str = "") -> str:
     out_dir = Path(settings.OUTPUT_DIR) / subdir
@@ -30,38 +83,68 @@ def read_file(file: str) -> bytes:
     with open(file, "rb") as f:
         return f.read()
 
-def as_base64(path: str, max_size: tuple = None, quality: int = None) -> str:
-    """Convert image to base64 with compression to reduce token usage"""
+def _resolve_upload(path: str) -> Path:
     # If path is just a filename, assume it's in the uploads directory
     if not Path(path).is_absolute() and not str(path).startswith('./'):
-        full_path = Path(settings.UPLOAD_DIR) / path
-    else:
-        full_path = Path(path)
-    
+        return Path(settings.UPLOAD_DIR) / path
+    return Path(path)
+
+def variant_path(source: Path, max_size: tuple, quality: int) -> Path:
+    """Where the compressed copy of an upload lives for the given size/quality settings."""
+    width, height = max_size
+    return source.with_name(f"{source.stem}__{width}x{height}_q{quality}.jpg")
+
+def _compress(source: Path, max_size: tuple, quality: int) -> bytes:
+    with Image.open(source) as img:
+        # For JPEGs, let the decoder downscale by 1/2, 1/4 or 1/8 while decoding instead of
+        # decoding the full 12+ MP frame and shrinking it afterwards
+        if img.format == "JPEG":
+            img.draft("RGB", max_size)
+        # Convert RGBA to RGB if necessary
+        if img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+        # Resize if too large
+        img.thumbnail(max_size, Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        img.save(buffer, format='JPEG', quality=quality, optimize=True)
+        return buffer.getvalue()
+
+def prepare_image(path: str, max_size: tuple = None, quality: int = None) -> bytes:
+    """Compressed JPEG bytes of an uploaded image, to reduce OCR time and token usage.
+
+    The image is decoded once and the result is stored next to the upload, keyed by
+    max_size and quality, so processing the same upload again only reads that file.
+    """
+    source = _resolve_upload(path)
     # Use config defaults if not specified
-    max_size = max_size or settings.MAX_IMAGE_SIZE
+    max_size = tuple(max_size or settings.MAX_IMAGE_SIZE)
     quality = quality or settings.IMAGE_QUALITY
-    
+    variant = variant_path(source, max_size, quality)
+
     try:
-        # Open and compress the image
-        with Image.open(full_path) as img:
-            # Convert RGBA to RGB if necessary
-            if img.mode in ('RGBA', 'LA', 'P'):
-                img = img.convert('RGB')
-            
-            # Resize if too large
-            img.thumbnail(max_size, Image.Resampling.LANCZOS)
-            
-            # Compress to JPEG in memory
-            buffer = io.BytesIO()
-            img.save(buffer, format='JPEG', quality=quality, optimize=True)
-            compressed_data = buffer.getvalue()
-            
-            print(f"📏 Image compressed: {len(read_file(str(full_path)))} bytes → {len(compressed_data)} bytes")
-            return base64.b64encode(compressed_data).decode("utf-8")
-            
+        if variant.exists() and variant.stat().st_mtime >= source.stat().st_mtime:
+            return read_file(str(variant))
+        compressed_data = _compress(source, max_size, quality)
+        tmp = variant.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(compressed_data)
+        os.replace(tmp, variant)
+        print(f"📏 Image compressed: {source.stat().st_size} bytes → {len(compressed_data)} bytes")
+        return compressed_data
     except Exception as e:
         print(f"⚠️ Image compression failed, using original: {e}")
         # Fallback to original file
-        data = read_file(str(full_path))
-        return base64.b64encode(data).decode("utf-8")
\ No newline at end of file
+        return read_file(str(source))
+
+def read_upload(path: str) -> bytes:
+    """The upload exactly as received, at full resolution."""
+    return read_file(str(_resolve_upload(path)))
+
+def image_pixels(path: str) -> int:
+    """Width × height of an upload, read from the header without decoding the image."""
+    with Image.open(_resolve_upload(path)) as img:
+        return img.width * img.height
+
+def as_base64(path: str, max_size: tuple = None, quality: int = None) -> str:
+    """Base64 of prepare_image(), for APIs that need the image inline."""
+    return base64.b64encode(prepare_image(path, max_size, quality)).decode("utf-8")
@@ -0,0 +1,40 @@
+from __future__ import annotations
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict
+
+from .jobs import JobManager
+from .state import State
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    return f"event: {event.get('event', 'message')}\ndata: {json.dumps(event)}\n\n"
+
+
+async def stream_job(jobs: JobManager, state: State) -> AsyncIterator[str]:
+    """Run a workflow on the job pool and yield its progress as server-sent events.
+
+    The worker thread hands events to the event loop through an asyncio.Queue; the stream
+    ends with a `result` event carrying the same payload as GET /jobs/{id}.
+    Raises JobQueueFull before anything is sent if the pool is saturated.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    job = jobs.submit(state, on_event=lambda event: loop.call_soon_threadsafe(queue.put_nowait, event))
+
+    async def events() -> AsyncIterator[str]:
+        yield format_sse({"event": "job", "job_id": job.id})
+        finished = asyncio.ensure_future(jobs.wait(job))
+        while not finished.done():
+            next_event = asyncio.ensure_future(queue.get())
+            await asyncio.wait({next_event, finished}, return_when=asyncio.FIRST_COMPLETED)
+            if next_event.done():
+                yield format_sse(next_event.result())
+            else:
+                next_event.cancel()
+        # Events emitted right before the job finished are already queued
+        while not queue.empty():
+            yield format_sse(queue.get_nowait())
+        yield format_sse({"event": "result", **job.to_dict()})
+
+    return events()
@@ -2,9 +2,14 @@ from __future__ import annotations
 import re
 from typing import Tuple
 from .config import settings
+from .jsx import find_syntax_error
 
 H1_RE = re.compile(r"^#\s+.+", re.M)
 SECTION_RE = re.compile(r"^##\s+.+", re.M)
+EXPORT_RE = re.compile(r"^\s*export\s+default\b", re.M)
+# Problems validate_react reports without a line number (see patches.failing_lines)
+MISSING_EXPORT = "Export a default React component (export default function BlogPost() { ... })."
+MISSING_COLOR = 'Define the color constant: const {name} = "{value}";'
 
 def validate_blog_markdown(markdown: str) -> Tuple[bool, str]:
     problems = []
@@ -18,11 +23,21 @@ def validate_blog_markdown(markdown: str) -> Tuple[bool, str]:
 
 
 def validate_react(code: str) -> Tuple[bool, str]:
+    """Local checks on a generated component; the feedback names exact lines for the repair prompt."""
+    if not code.strip():
+        return False, "React code is empty. Write the full component."
     problems = []
-    # if "export default function" not in code and "export default" not in code:
-    #     problems.append("Export a default React component.")
-    # if "return (" not in code:
-    #     problems.append("Component must render JSX.")
-    # if "props" not in code and "({" not in code:
-    #     problems.append("Accept props or content input.")
-    return (len(problems) == 0, "\n".join(problems))
\ No newline at end of file
+    if settings.REACT_CHECK_SYNTAX and (error := find_syntax_error(code)) is not None:
+        problems.append(f"Syntax error: {error}")
+
+    if not EXPORT_RE.search(code):
+        problems.append(MISSING_EXPORT)
+
+    for name, value in settings.REACT_REQUIRED_COLORS.items():
+        match = re.search(rf"\b(?:const|let|var)\s+{re.escape(name)}\b(?:\s*:\s*[\w.]+)?\s*=\s*([\"'`])(.*?)\1", code)
+        if match is None:
+            problems.append(MISSING_COLOR.format(name=name, value=value))
+        elif match.group(2).lower() != value.lower():
+            line = code.count("\n", 0, match.start()) + 1
+            problems.append(f'Line {line}: {name} is "{match.group(2)}" but must be "{value}".')
+    return (len(problems) == 0, "\n".join(problems))
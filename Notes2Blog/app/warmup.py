@@ -0,0 +1,61 @@
+from __future__ import annotations
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+def _warm_steps() -> List[Tuple[str, Callable[[], Any]]]:
+    # Imported here so that importing app.main does not load DSPy, LangGraph or OpenCV
+    from .storage import ensure_dirs
+    from .modules.lm import configure_lm
+    from .modules.pipeline import image_to_text
+    from .modules.react_program import get_react_program
+    from .jobs import get_workflow
+    from .config import settings
+
+    steps = [
+        ("storage", ensure_dirs),
+        ("lm", configure_lm),
+        ("ocr", image_to_text.ocr_tool.warm_up),
+    ]
+    # The template renderer needs no compiled program; creative jobs compile it on first use
+    if settings.REACT_MODE == "creative":
+        steps.append(("react_program", get_react_program))
+    return steps + [("workflow", get_workflow)]
+
+
+class WarmUp:
+    """Builds the heavy pipeline objects in a background thread and tracks readiness for GET /ready."""
+
+    def __init__(self):
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.error: Optional[str] = None
+        self.timings_ms: Dict[str, float] = {}
+
+    @property
+    def ready(self) -> bool:
+        return self._done.is_set() and self.error is None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name="notes2blog-warmup", daemon=True)
+            self._thread.start()
+
+    def run(self) -> None:
+        try:
+            for name, step in _warm_steps():
+                started = time.perf_counter()
+                step()
+                self.timings_ms[name] = round((time.perf_counter() - started) * 1000, 1)
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            print(f"⚠️ Warm-up failed: {self.error}")
+        finally:
+            self._done.set()
+
+    def status(self) -> Dict[str, Any]:
+        return {"ready": self.ready, "error": self.error, "timings_ms": self.timings_ms}
+
+
+warmup = WarmUp()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Fake OpenAI-compatible server for load tests
+
+Serves POST /v1/chat/completions (plain and streaming, text and vision requests) with
+deterministic, well-formed output after a configurable latency, and can inject 500 errors
+and 429 rate limits at a given rate. DSPy requests get every field their signature asks
+for in the ChatAdapter's [[ ## field ## ]] format; vision requests get a page of notes.
+
+Point the app at it with OPENAI_BASE_URL=http://127.0.0.1:<port>/v1 and any OPENAI_API_KEY.
+
+Run from the Notes2Blog directory:
+    python benchmarks/fake_openai.py --port 8100 --latency 0.5 --rate-limit-rate 0.05
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+SAMPLE_NOTES = """Deliberate practice
+- Pick one skill, break it into small pieces
+- Practice the weakest piece, not the fun one
+- Get feedback fast: record, compare, adjust
+- 20 focused minutes beat 2 distracted hours
+Habits
+- Same time, same place, every day
+- Track streaks on paper
+Reading list: Peak, Atomic Habits, So Good They Can't Ignore You"""
+
+SAMPLE_MARKDOWN = """# Getting Better on Purpose
+
+## Deliberate practice
+
+Pick one skill and break it into small pieces. Practice the weakest piece, not the fun one,
+and get feedback fast: record yourself, compare against a reference and adjust.
+
+## Habits
+
+Twenty focused minutes beat two distracted hours. Practice at the same time and place every
+day, and keep a streak on paper so missing a day is visible.
+
+## Further reading
+
+Peak, Atomic Habits and So Good They Can't Ignore You.
+"""
+
+SAMPLE_REACT = """import React from "react";
+import { motion } from "framer-motion";
+
+const ACCENT_RED = "#dc2626";
+const BG_OFFWHITE = "#fffcf8";
+
+export default function BlogPost() {
+  return (
+    <div className="min-h-screen" style={{ backgroundColor: BG_OFFWHITE }}>
+      <motion.article className="mx-auto max-w-3xl px-6 py-12" initial={{ opacity: 0 }} animate={{ opacity: 1 }}>
+        <h1 className="text-4xl font-bold" style={{ color: ACCENT_RED }}>Getting Better on Purpose</h1>
+        <h2 className="mt-8 text-2xl font-semibold">Deliberate practice</h2>
+        <p className="mt-4">Pick one skill and break it into small pieces.</p>
+        <h2 className="mt-8 text-2xl font-semibold">Habits</h2>
+        <p className="mt-4">Twenty focused minutes beat two distracted hours.</p>
+      </motion.article>
+    </div>
+  );
+}"""
+
+# Output field values by name; fields not listed get a short placeholder sentence
+DEFAULT_VALUES = {
+    "outline": json.dumps(["Deliberate practice", "Habits", "Reading list"]),
+    "tags": json.dumps(["learning", "habits", "practice"]),
+    "reading_time": "4",
+    "theme": "Deliberate practice and habits",
+    "title": "Getting Better on Purpose",
+    "summary": "How small, focused practice sessions and daily habits add up to real skill.",
+    "slug": "getting-better-on-purpose",
+    "blog_markdown": SAMPLE_MARKDOWN,
+    "react_code": SAMPLE_REACT,
+    "improved_react_code": SAMPLE_REACT,
+}
+
+
+def is_vision(messages: List[Dict[str, Any]]) -> bool:
+    return isinstance(messages[-1].get("content"), list)
+
+
+def reply(messages: List[Dict[str, Any]], values: Dict[str, str] = None) -> str:
+    """The assistant message for a chat request, derived only from the request."""
+    if is_vision(messages):
+        return SAMPLE_NOTES
+    values = values or DEFAULT_VALUES
+    system = messages[0]["content"] if messages and isinstance(messages[0].get("content"), str) else ""
+    if "Your output fields are:" not in system:
+        return SAMPLE_NOTES
+    listing = system.split("Your output fields are:", 1)[1].split("All interactions", 1)[0]
+    parts = [f"[[ ## {name} ## ]]\n{values.get(name, f'A short {name} for the benchmark.')}" for name in re.findall(r"\d+\. `(\w+)`", listing)]
+    return "\n\n".join(parts + ["[[ ## completed ## ]]"])
+
+
+def usage(messages: List[Dict[str, Any]], content: str) -> Dict[str, int]:
+    prompt_tokens = sum(len(str(message.get("content", ""))) for message in messages) // 4
+    completion_tokens = len(content) // 4
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens}
+
+
+class FakeOpenAIServer:
+    """Threaded HTTP server answering chat completions like the OpenAI API.
+
+    Each request sleeps `latency` (or `vision_latency` for image requests) plus up to
+    `jitter` seconds. A `rate_limit_rate` share of requests is answered at once with a 429
+    and a retry-after of `retry_after` seconds; an `error_rate` share fails with a 500 after
+    the latency. Faults are drawn from a seeded RNG, so a run is repeatable.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.5, vision_latency: Optional[float] = None,
+                 jitter: float = 0.0, error_rate: float = 0.0, rate_limit_rate: float = 0.0, retry_after: float = 1.0, seed: int = 0):
+        self.latency = latency
+        self.vision_latency = latency if vision_latency is None else vision_latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.counters = {"requests": 0, "vision_requests": 0, "streamed": 0, "rate_limited": 0, "errors": 0, "max_in_flight": 0}
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeOpenAIServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counters)
+
+    def reset_peak(self) -> None:
+        """Start tracking max_in_flight afresh, e.g. between load-test phases."""
+        with self._lock:
+            self.counters["max_in_flight"] = self._in_flight
+
+    def _admit(self, vision: bool) -> Optional[int]:
+        """Count the request and pick its fault: 429, 500 or None."""
+        with self._lock:
+            self.counters["requests"] += 1
+            self.counters["vision_requests"] += vision
+            roll = self._random.random()
+            if roll < self.rate_limit_rate:
+                self.counters["rate_limited"] += 1
+                return 429
+            if roll < self.rate_limit_rate + self.error_rate:
+                self.counters["errors"] += 1
+                return 500
+            return None
+
+    def _delay(self, vision: bool) -> float:
+        with self._lock:
+            return (self.vision_latency if vision else self.latency) + self._random.uniform(0, self.jitter)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, like the real API
+
+            def log_message(self, *args):
+                pass
+
+            def _json(self, status: int, body: Dict[str, Any], headers: Dict[str, str] = None) -> None:
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _chunk(self, data: bytes) -> None:
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("content-length", 0)))
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+                    return
+                request = json.loads(body or b"{}")
+                messages = request.get("messages") or [{"role": "user", "content": ""}]
+                vision = is_vision(messages)
+                fault = server._admit(vision)
+                if fault == 429:
+                    self._json(429, {"error": {"message": "Rate limit reached (injected)", "type": "rate_limit_error", "code": "rate_limit_exceeded"}},
+                               {"retry-after": f"{server.retry_after:g}"})
+                    return
+                with server._lock:
+                    server._in_flight += 1
+                    server.counters["max_in_flight"] = max(server.counters["max_in_flight"], server._in_flight)
+                try:
+                    time.sleep(server._delay(vision))
+                    if fault == 500:
+                        self._json(500, {"error": {"message": "Internal server error (injected)", "type": "server_error"}})
+                        return
+                    content = reply(messages)
+                    model = request.get("model", "fake")
+                    if request.get("stream"):
+                        with server._lock:
+                            server.counters["streamed"] += 1
+                        self._stream(model, content, usage(messages, content))
+                    else:
+                        self._json(200, {
+                            "id": "chatcmpl-fake",
+                            "object": "chat.completion",
+                            "created": int(time.time()),
+                            "model": model,
+                            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+                            "usage": usage(messages, content),
+                        })
+                finally:
+                    with server._lock:
+                        server._in_flight -= 1
+
+            def _stream(self, model: str, content: str, token_usage: Dict[str, int]) -> None:
+                self.send_response(200)
+                self.send_header("content-type", "text/event-stream")
+                self.send_header("transfer-encoding", "chunked")
+                self.end_headers()
+                base = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()), "model": model}
+                for i in range(0, len(content), 16):
+                    delta = {"index": 0, "delta": {"content": content[i:i + 16]}, "finish_reason": None}
+                    self._chunk(f"data: {json.dumps({**base, 'choices': [delta]})}\n\n".encode())
+                done = {"index": 0, "delta": {}, "finish_reason": "stop"}
+                self._chunk(f"data: {json.dumps({**base, 'choices': [done]})}\n\n".encode())
+                self._chunk(f"data: {json.dumps({**base, 'choices': [], 'usage': token_usage})}\n\n".encode())
+                self._chunk(b"data: [DONE]\n\n")
+                self.wfile.write(b"0\r\n\r\n")
+
+        return Handler
+
+
+def add_server_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds per text completion")
+    parser.add_argument("--vision-latency", type=float, help="Seconds per vision (OCR) completion (default: --latency)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random delay of up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests that fail with a 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests rejected with a 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="retry-after seconds sent with each 429")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for jitter and fault injection")
+
+
+def server_from_args(args: argparse.Namespace, port: int = 0) -> FakeOpenAIServer:
+    return FakeOpenAIServer(port=port, latency=args.latency, vision_latency=args.vision_latency, jitter=args.jitter,
+                            error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, retry_after=args.retry_after, seed=args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a fake OpenAI-compatible chat completions server")
+    parser.add_argument("--port", type=int, default=8100)
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    server = server_from_args(args, args.port).start()
+    print(f"🤖 Fake OpenAI server at {server.base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(5)
+    except KeyboardInterrupt:
+        print(f"\n📊 {server.stats()}")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
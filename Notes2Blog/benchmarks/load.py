@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test for Notes2Blog
+
+Starts the fake OpenAI server (benchmarks/fake_openai.py) and the FastAPI app under uvicorn
+pointed at it, then drives concurrent upload + process traffic. Each simulated client
+uploads a page with POST /ingest, queues it with POST /process and polls GET /jobs/{id}
+until the job finishes. For every concurrency level it reports throughput and p50/p95/p99
+end-to-end latency, plus what the fake server saw (requests in flight, injected 429s and
+500s) and how the app's OpenAI pool reacted (retries).
+
+Every request uploads a different page, and the app's OCR and LM caches are disabled, so
+each job makes the full set of model calls. App settings can be overridden with --env.
+
+Run from the Notes2Blog directory:
+    python benchmarks/load.py --concurrency 1,4,16 --requests 32 --latency 0.5 --json load.json
+    python benchmarks/load.py --concurrency 8 --rate-limit-rate 0.05 --error-rate 0.02 --env JOB_WORKERS=8
+"""
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+from typing import Any, Dict, List
+
+from fake_openai import add_server_arguments, server_from_args
+from startup import free_port, wait_for
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def sample_page(number: int) -> bytes:
+    """A distinct JPEG page per request, so uploads are never deduplicated."""
+    from PIL import Image, ImageDraw
+
+    page = Image.new("RGB", (1600, 2100), (250, 248, 240))
+    draw = ImageDraw.Draw(page)
+    for i in range(30):
+        draw.text((120, 120 + i * 60), f"Load test page {number}, line {i}: deliberate practice beats repetition", fill=(30, 30, 40))
+    buffer = io.BytesIO()
+    page.save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def get_json(url: str) -> Dict[str, Any]:
+    with urllib.request.urlopen(url, timeout=10) as response:
+        return json.loads(response.read())
+
+
+async def one_request(client, base: str, number: int, image: bytes, poll: float, timeout: float) -> Dict[str, Any]:
+    started = time.perf_counter()
+    response = await client.post(f"{base}/ingest", files={"file": (f"load-{number}.jpg", image, "image/jpeg")})
+    if response.status_code != 200:
+        return {"outcome": "error", "status": response.status_code}
+    response = await client.post(f"{base}/process", json={"image_path": response.json()["image_path"]})
+    if response.status_code == 503:
+        return {"outcome": "rejected"}
+    if response.status_code != 202:
+        return {"outcome": "error", "status": response.status_code}
+    job_id = response.json()["job_id"]
+    deadline = started + timeout
+    while time.perf_counter() < deadline:
+        job = (await client.get(f"{base}/jobs/{job_id}")).json()
+        if job["status"] in ("completed", "failed"):
+            outcome = "ok" if job["status"] == "completed" else "failed"
+            return {"outcome": outcome, "latency_s": time.perf_counter() - started}
+        await asyncio.sleep(poll)
+    return {"outcome": "timeout"}
+
+
+async def run_level(base: str, concurrency: int, images: List[bytes], poll: float, timeout: float) -> Dict[str, Any]:
+    import httpx
+
+    results: List[Dict[str, Any]] = []
+    queue = list(enumerate(images))
+
+    async def client_loop(client):
+        while queue:
+            number, image = queue.pop(0)
+            try:
+                results.append(await one_request(client, base, number, image, poll, timeout))
+            except httpx.HTTPError as e:
+                results.append({"outcome": "error", "status": type(e).__name__})
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies = [r["latency_s"] for r in results if r["outcome"] == "ok"]
+    outcomes = {name: sum(r["outcome"] == name for r in results) for name in ("ok", "failed", "rejected", "timeout", "error")}
+    level = {
+        "concurrency": concurrency,
+        "requests": len(results),
+        **outcomes,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(outcomes["ok"] / elapsed, 3),
+    }
+    if latencies:
+        level["latency_s"] = {
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "max": round(max(latencies), 3),
+        }
+    return level
+
+
+def delta(after: Dict[str, Any], before: Dict[str, Any], keys) -> Dict[str, Any]:
+    return {key: after.get(key, 0) - before.get(key, 0) for key in keys}
+
+
+def start_app(port: int, fake_url: str, workdir: Path, overrides: List[str]) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "OPENAI_BASE_URL": fake_url,
+        "OPENAI_API_KEY": "load-test",
+        "USE_OPENAI_VISION": "true",
+        "OUTPUT_DIR": str(workdir / "outputs"),
+        "UPLOAD_DIR": str(workdir / "uploads"),
+        "REACT_PROGRAM_PATH": str(workdir / "react_program.json"),
+        "LM_CACHE_ENABLED": "false",
+        "OCR_CACHE_ENABLED": "false",
+        "WARMUP_ON_STARTUP": "true",
+    }
+    for override in overrides:
+        key, _, value = override.partition("=")
+        env[key] = value
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the Notes2Blog API against a fake OpenAI server")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated numbers of concurrent clients")
+    parser.add_argument("--requests", type=int, default=32, help="Upload + process round trips per concurrency level")
+    parser.add_argument("--poll", type=float, default=0.05, help="Seconds between GET /jobs/{id} polls")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Seconds before a single round trip counts as timed out")
+    parser.add_argument("--startup-timeout", type=float, default=180.0, help="Seconds to wait for GET /ready")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="App setting override (repeatable), e.g. JOB_WORKERS=8")
+    parser.add_argument("--json", dest="json_out", help="Write the results to this file")
+    add_server_arguments(parser)
+    args = parser.parse_args()
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    fake = server_from_args(args).start()
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory(prefix="notes2blog-load-") as tmp:
+        print(f"🤖 Fake OpenAI server at {fake.base_url}")
+        app = start_app(port, fake.base_url, Path(tmp), args.env)
+        try:
+            print("🚀 Starting the app and waiting for warm-up...")
+            wait_for(f"{base}/ready", time.perf_counter() + args.startup_timeout)
+            images = [sample_page(n) for n in range(args.requests * len(levels))]
+            results = {
+                "benchmark": "load",
+                "params": {
+                    "requests": args.requests,
+                    "latency_s": args.latency,
+                    "vision_latency_s": args.vision_latency if args.vision_latency is not None else args.latency,
+                    "jitter_s": args.jitter,
+                    "error_rate": args.error_rate,
+                    "rate_limit_rate": args.rate_limit_rate,
+                    "env": args.env,
+                },
+                "levels": [],
+            }
+            for index, concurrency in enumerate(levels):
+                print(f"⏱️  {args.requests} requests at concurrency {concurrency}...")
+                fake.reset_peak()
+                upstream_before, pool_before = fake.stats(), get_json(f"{base}/cache/stats")["openai"]
+                batch = images[index * args.requests:(index + 1) * args.requests]
+                level = asyncio.run(run_level(base, concurrency, batch, args.poll, args.timeout))
+                upstream_after, pool_after = fake.stats(), get_json(f"{base}/cache/stats")["openai"]
+                level["upstream"] = {
+                    **delta(upstream_after, upstream_before, ("requests", "rate_limited", "errors")),
+                    "max_in_flight": upstream_after["max_in_flight"],
+                }
+                level["app_openai"] = delta(pool_after, pool_before, ("requests", "retries", "rate_limited", "errors"))
+                results["levels"].append(level)
+                latency = level.get("latency_s", {})
+                print(
+                    f"   {level['throughput_rps']:.2f} req/s, p50 {latency.get('p50', 0):.2f}s, p95 {latency.get('p95', 0):.2f}s, "
+                    f"p99 {latency.get('p99', 0):.2f}s ({level['ok']} ok, {level['failed']} failed, {level['rejected']} rejected)"
+                )
+        finally:
+            app.terminate()
+            app.wait(timeout=30)
+            fake.stop()
+
+    if args.json_out:
+        Path(args.json_out).write_text(json.dumps(results, indent=2))
+        print(f"💾 Results saved to: {args.json_out}")
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
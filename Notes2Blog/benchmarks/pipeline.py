@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Pipeline benchmark for Notes2Blog
+
+Runs each pipeline module (ImageToText, ThemeAndOutline, GenerateBlog, the fused
+ThemeOutlineAndBlog, BlogMetadata, GenerateReactCode, the LocalMetadata and ReactTemplate
+fast paths) and the full LangGraph workflow against a deterministic, in-process
+stand-in for the OpenAI API. The stand-in answers every request with fixed, well-formed
+output after exactly --latency seconds, so the time the pipeline spends while no model
+request is outstanding is our own overhead: DSPy prompt building and parsing, the client
+pool, LangGraph, image preparation, validation and the artifact/catalog writes.
+
+No network or API key is needed. Caches are disabled and everything is written to a
+temporary directory. The JSON output has stable keys, so runs from different commits can
+be diffed directly or with --compare.
+
+Run from the Notes2Blog directory:
+    python benchmarks/pipeline.py --runs 10 --latency 0.05 --json pipeline.json
+    python benchmarks/pipeline.py --runs 10 --compare pipeline.json
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from fake_openai import DEFAULT_VALUES, SAMPLE_NOTES, reply, usage
+
+ROOT = Path(__file__).resolve().parent.parent
+
+def configure_environment(workdir: Path) -> None:
+    """Point the app at a scratch directory and the stand-in API. Must run before `app` is imported."""
+    os.environ.update(
+        {
+            "OUTPUT_DIR": str(workdir / "outputs"),
+            "UPLOAD_DIR": str(workdir / "uploads"),
+            "REACT_PROGRAM_PATH": str(workdir / "react_program.json"),
+            "LM_CACHE_ENABLED": "false",
+            "OCR_CACHE_ENABLED": "false",
+            "USE_OPENAI_VISION": "true",
+            "OPENAI_API_KEY": "benchmark",
+            "OCR_MODE": "page",
+            "OCR_HYBRID": "false",
+            # The stand-in has no limits; keep the pool's buckets from adding waits of their own
+            "OPENAI_REQUESTS_PER_MINUTE": "1000000",
+            "OPENAI_TOKENS_PER_MINUTE": "1000000000",
+        }
+    )
+    sys.path.insert(0, str(ROOT))
+
+
+class StandInCompletions:
+    """Answers chat completions after a fixed delay, with output derived only from the request.
+
+    The replies are the fake OpenAI server's (see fake_openai.reply), served in-process so no
+    HTTP is involved; streamed requests get the same reply as chunks. Request start and end
+    times are kept so the time spent waiting on the model can be subtracted.
+    """
+
+    def __init__(self, latency: float):
+        from app.modules.react_example import REACT_EXAMPLE_CODE, REACT_EXAMPLE_MARKDOWN
+
+        self.latency = latency
+        self.intervals: List[Tuple[float, float]] = []
+        self._lock = threading.Lock()
+        # The training example's article and component, so prompts and outputs have realistic sizes
+        self._values = {**DEFAULT_VALUES, "blog_markdown": REACT_EXAMPLE_MARKDOWN, "react_code": REACT_EXAMPLE_CODE, "improved_react_code": REACT_EXAMPLE_CODE}
+
+    @property
+    def chat(self):
+        return self
+
+    @property
+    def completions(self):
+        return self
+
+    async def create(self, model: str, messages: List[Dict[str, Any]], stream: bool = False, **kwargs):
+        from openai.types.chat import ChatCompletion
+
+        started = time.perf_counter()
+        await asyncio.sleep(self.latency)
+        content = reply(messages, self._values)
+        with self._lock:
+            self.intervals.append((started, time.perf_counter()))
+        if stream:
+            return self._chunks(model, content, usage(messages, content))
+        return ChatCompletion(
+            id="benchmark",
+            object="chat.completion",
+            created=0,
+            model=model,
+            choices=[{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+            usage=usage(messages, content),
+        )
+
+    async def _chunks(self, model: str, content: str, token_usage: Dict[str, int]):
+        # Same framing as the fake server's stream: 16-character deltas, a finish chunk, then usage
+        from openai.types.chat import ChatCompletionChunk
+
+        base = {"id": "benchmark", "object": "chat.completion.chunk", "created": 0, "model": model}
+        for i in range(0, len(content), 16):
+            yield ChatCompletionChunk(**base, choices=[{"index": 0, "delta": {"content": content[i:i + 16]}, "finish_reason": None}])
+        yield ChatCompletionChunk(**base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        yield ChatCompletionChunk(**base, choices=[], usage=token_usage)
+
+    def busy(self, since: float) -> Tuple[int, float]:
+        """Requests started since `since`, and the seconds during which at least one was in flight."""
+        with self._lock:
+            intervals = sorted(interval for interval in self.intervals if interval[0] >= since)
+        busy, end = 0.0, since
+        for start, stop in intervals:
+            busy += max(0.0, stop - max(start, end))
+            end = max(end, stop)
+        return len(intervals), busy
+
+
+def make_sample_page(path: Path) -> None:
+    """A letter-sized page of notes as a phone photo would be, big enough that prepare_image has work to do."""
+    from PIL import Image, ImageDraw
+
+    page = Image.new("RGB", (2400, 3200), (250, 248, 240))
+    draw = ImageDraw.Draw(page)
+    for i, line in enumerate(SAMPLE_NOTES.splitlines() * 3):
+        draw.text((160, 160 + i * 90), line, fill=(30, 30, 40))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    page.save(path, "JPEG", quality=92)
+
+
+def stages(image_path: Path) -> Dict[str, Callable[[int], Any]]:
+    """Each stage as a callable taking the run number. Inputs are fixed, so every run does the same work."""
+    from app.jobs import get_workflow
+    from app.modules.pipeline import generate_blog, generate_metadata, image_to_text, theme_and_outline, theme_outline_and_blog
+    from app.modules.react_program import get_react_program
+    from app.modules.metadata import local_metadata
+    from app.modules.react_template import render_react
+    from app.storage import prepare_image
+
+    workflow = get_workflow()  # Also configures the LM, which now goes through the stand-in
+    image = prepare_image(str(image_path))
+    outline = ["Deliberate practice", "Habits", "Reading list"]
+    theme = "Deliberate practice and habits"
+    markdown = generate_blog(raw_text=SAMPLE_NOTES, theme=theme, outline=outline).blog_markdown
+    react_program = get_react_program()
+
+    return {
+        "ImageToText": lambda run: image_to_text(image=image),
+        "ThemeAndOutline": lambda run: theme_and_outline(raw_text=SAMPLE_NOTES),
+        "GenerateBlog": lambda run: generate_blog(raw_text=SAMPLE_NOTES, theme=theme, outline=outline),
+        "ThemeOutlineAndBlog": lambda run: theme_outline_and_blog(raw_text=SAMPLE_NOTES),
+        "BlogMetadata": lambda run: generate_metadata(blog_markdown=markdown, theme=theme),
+        "LocalMetadata": lambda run: local_metadata(markdown, theme),
+        "GenerateReactCode": lambda run: react_program(blog_markdown=markdown),
+        "ReactTemplate": lambda run: render_react(markdown, title=theme),
+        "graph": lambda run: workflow.invoke({"image_path": str(image_path), "logs": [], "job_id": f"benchmark-{run:04d}"}, {"configurable": {"thread_id": f"benchmark-{run:04d}"}}),
+    }
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    return {
+        "min": round(min(values), 3),
+        "median": round(statistics.median(values), 3),
+        "max": round(max(values), 3),
+    }
+
+
+def measure(name: str, fn: Callable[[int], Any], stand_in: StandInCompletions, runs: int, warmup: int) -> Dict[str, Any]:
+    for run in range(warmup):
+        fn(-1 - run)
+    walls, overheads, lm_times, calls, node_runs = [], [], [], [], []
+    for run in range(runs):
+        started = time.perf_counter()
+        result = fn(run)
+        wall = time.perf_counter() - started
+        lm_calls, lm_busy = stand_in.busy(started)
+        walls.append(wall * 1000)
+        lm_times.append(lm_busy * 1000)
+        overheads.append((wall - lm_busy) * 1000)
+        calls.append(lm_calls)
+        if name == "graph":
+            node_runs.append(result.get("trace", []))
+    stage = {
+        "wall_ms": summarize(walls),
+        "lm_ms": summarize(lm_times),
+        "overhead_ms": summarize(overheads),
+        "lm_calls": max(calls),
+    }
+    if node_runs:
+        stage["nodes"] = node_breakdown(node_runs, stand_in.latency)
+    return stage
+
+
+def node_breakdown(traces: List[List[Dict[str, Any]]], latency: float) -> Dict[str, Any]:
+    """Median time per graph node and its overhead, taking each of its LM calls as `latency`."""
+    per_node: Dict[str, Dict[str, List[float]]] = {}
+    for trace in traces:
+        for entry in trace:
+            node = per_node.setdefault(entry["node"], {"ms": [], "overhead_ms": [], "lm_calls": []})
+            node["ms"].append(entry["ms"])
+            node["overhead_ms"].append(entry["ms"] - entry.get("api_requests", 0) * latency * 1000)
+            node["lm_calls"].append(entry.get("api_requests", 0))
+    return {
+        name: {
+            "ms": round(statistics.median(values["ms"]), 3),
+            "overhead_ms": round(statistics.median(values["overhead_ms"]), 3),
+            "lm_calls": max(values["lm_calls"]),
+        }
+        for name, values in sorted(per_node.items())
+    }
+
+
+def measure_memory(name: str, fn: Callable[[int], Any]) -> float:
+    """Peak Python heap growth (KiB) during one run, measured separately because tracing slows everything down."""
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        fn(10_000)
+        return round((tracemalloc.get_traced_memory()[1] - baseline) / 1024, 1)
+    finally:
+        tracemalloc.stop()
+
+
+def max_rss_mb() -> float:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0.0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    print(f"\n📊 Overhead vs {baseline.get('commit', 'baseline')} (median ms, lower is better)")
+    for name, stage in current["stages"].items():
+        before = baseline.get("stages", {}).get(name)
+        now = stage["overhead_ms"]["median"]
+        if before is None:
+            print(f"   {name:<18} {now:>9.1f}   (new)")
+            continue
+        then = before["overhead_ms"]["median"]
+        change = f"{(now - then) / then * 100:+.1f}%" if then else "n/a"
+        print(f"   {name:<18} {then:>9.1f} -> {now:>9.1f}   {change}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Notes2Blog pipeline against a deterministic stand-in LM")
+    parser.add_argument("--runs", type=int, default=5, help="Timed repetitions per stage")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed repetitions per stage before measuring")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds the stand-in takes per LM request")
+    parser.add_argument("--stages", help="Comma-separated subset of stages to run (default: all)")
+    parser.add_argument("--skip-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--json", dest="json_out", help="Write the results to this file")
+    parser.add_argument("--compare", help="Print overhead changes against an earlier --json result")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="notes2blog-bench-") as tmp:
+        workdir = Path(tmp)
+        configure_environment(workdir)
+        from importlib.metadata import version
+        from app.modules.openai_pool import openai_pool
+
+        stand_in = StandInCompletions(args.latency)
+        openai_pool.start(client=stand_in)
+        image_path = workdir / "uploads" / "page.jpg"
+        make_sample_page(image_path)
+
+        print("🔧 Building the pipeline (compiles the React program against the stand-in)...")
+        with contextlib.redirect_stdout(io.StringIO()):
+            selected = stages(image_path)
+        if args.stages:
+            wanted = [name.strip() for name in args.stages.split(",")]
+            unknown = sorted(set(wanted) - set(selected))
+            if unknown:
+                parser.error(f"unknown stages {unknown}, choose from {sorted(selected)}")
+            selected = {name: selected[name] for name in wanted}
+
+        results = {
+            "benchmark": "pipeline",
+            "commit": git_commit(),
+            "python": sys.version.split()[0],
+            "dspy": version("dspy"),
+            "langgraph": version("langgraph"),
+            "params": {"runs": args.runs, "warmup": args.warmup, "latency_s": args.latency},
+            "stages": {},
+        }
+        for name, fn in selected.items():
+            print(f"⏱️  {name}...")
+            with contextlib.redirect_stdout(io.StringIO()):
+                stage = measure(name, fn, stand_in, args.runs, args.warmup)
+                if not args.skip_memory:
+                    stage["peak_alloc_kib"] = measure_memory(name, fn)
+            results["stages"][name] = stage
+            print(f"   wall {stage['wall_ms']['median']:.1f} ms, LM {stage['lm_ms']['median']:.1f} ms, overhead {stage['overhead_ms']['median']:.1f} ms ({stage['lm_calls']} calls)")
+        results["max_rss_mb"] = max_rss_mb()
+        openai_pool_stats = openai_pool.stats()
+        results["openai_pool"] = {key: openai_pool_stats[key] for key in ("requests", "retries", "errors")}
+
+    if args.json_out:
+        Path(args.json_out).write_text(json.dumps(results, indent=2))
+        print(f"💾 Results saved to: {args.json_out}")
+    else:
+        print(json.dumps(results, indent=2))
+    if args.compare:
+        compare(results, json.loads(Path(args.compare).read_text()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for Notes2Blog
+
+Measures how long `import app.main` takes in a fresh interpreter, and how long a
+freshly spawned uvicorn worker needs until it answers its first request (GET /)
+and until GET /ready reports the pipeline as warm.
+
+Run from the Notes2Blog directory:
+    python benchmarks/startup.py --runs 5 --json startup.json
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - started)"
+)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_import() -> float:
+    out = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], cwd=ROOT, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def wait_for(url: str, deadline: float, expect_ok: bool = True) -> float:
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if not expect_ok or response.status == 200:
+                    return time.perf_counter()
+        except urllib.error.HTTPError as e:
+            if not expect_ok:
+                return time.perf_counter()
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(0.02)
+    raise TimeoutError(f"{url} did not become available in time")
+
+
+def measure_server(timeout: float) -> dict:
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = started + timeout
+        first_response = wait_for(f"{base}/", deadline) - started
+        ready = wait_for(f"{base}/ready", deadline) - started
+        with urllib.request.urlopen(f"{base}/ready", timeout=1) as response:
+            warmup = json.loads(response.read())
+        return {"first_response_s": first_response, "ready_s": ready, "warmup": warmup}
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def summarize(values: list) -> dict:
+    return {
+        "min": round(min(values), 4),
+        "median": round(statistics.median(values), 4),
+        "max": round(max(values), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure Notes2Blog import time and time to first ready response")
+    parser.add_argument("--runs", type=int, default=3, help="Repetitions per measurement")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds to wait for a server to become ready")
+    parser.add_argument("--skip-server", action="store_true", help="Only measure import time")
+    parser.add_argument("--json", dest="json_out", help="Write the results to this file")
+    args = parser.parse_args()
+
+    print("⏱️  Measuring import time...")
+    imports = [measure_import() for _ in range(args.runs)]
+    results = {"python": sys.version.split()[0], "runs": args.runs, "import_s": summarize(imports)}
+    print(f"   import app.main: {results['import_s']}")
+
+    if not args.skip_server:
+        print("⏱️  Measuring server startup...")
+        servers = [measure_server(args.timeout) for _ in range(args.runs)]
+        results["first_response_s"] = summarize([s["first_response_s"] for s in servers])
+        results["ready_s"] = summarize([s["ready_s"] for s in servers])
+        results["last_warmup"] = servers[-1]["warmup"]
+        print(f"   first response:  {results['first_response_s']}")
+        print(f"   ready:           {results['ready_s']}")
+
+    if args.json_out:
+        Path(args.json_out).write_text(json.dumps(results, indent=2))
+        print(f"💾 Results saved to: {args.json_out}")
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ import requests
 import json
 from pathlib import Path
 import sys
+import time
 
 def test_notes_image(image_path: str, base_url: str = "http://localhost:8000"):
     """Test the Notes2Blog pipeline with an image file"""
@@ -41,11 +42,23 @@ def test_notes_image(image_path: str, base_url: str = "http://localhost:8000"):
             headers={'Content-Type': 'application/json'}
         )
         
-        if process_response.status_code != 200:
+        if process_response.status_code != 202:
             print(f"❌ Processing failed: {process_response.text}")
             return False
         
-        result = process_response.json()
+        job_id = process_response.json().get('job_id')
+        print(f"⏳ Job queued: {job_id}")
+        while True:
+            job = requests.get(f"{base_url}/jobs/{job_id}").json()
+            if job.get('status') in ('completed', 'failed'):
+                break
+            time.sleep(1)
+        
+        if job.get('status') == 'failed':
+            print(f"❌ Processing failed: {job.get('error')}")
+            return False
+        
+        result = job.get('result', {})
         
         # Step 3: Display results
         print("\n" + "="*50)
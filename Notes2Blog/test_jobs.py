@@ -0,0 +1,47 @@
+"""
+Tests for running jobs in worker processes (JOB_EXECUTOR=process)
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from fake_openai import FakeOpenAIServer  # noqa: E402
+from load import sample_page, start_app  # noqa: E402
+from startup import free_port, wait_for  # noqa: E402
+
+
+def test_process_job_right_after_startup():
+    # The job is queued while the warm-up and artifact cleanup threads are still importing
+    # DSPy and LangGraph; a worker forked at that moment used to hang on their import locks
+    fake = FakeOpenAIServer(latency=0.05).start()
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory(prefix="notes2blog-test-") as tmp:
+        app = start_app(port, fake.base_url, Path(tmp), ["JOB_EXECUTOR=process", "JOB_WORKERS=1"])
+        try:
+            wait_for(f"{base}/", time.perf_counter() + 60, expect_ok=False)
+            with httpx.Client(base_url=base, timeout=30) as client:
+                upload = client.post("/ingest", files={"file": ("page.jpg", sample_page(0), "image/jpeg")})
+                assert upload.status_code == 200
+                response = client.post("/process", json={"image_path": upload.json()["image_path"]})
+                assert response.status_code == 202
+                job_id = response.json()["job_id"]
+                deadline = time.perf_counter() + 120
+                job = {}
+                while time.perf_counter() < deadline:
+                    job = client.get(f"/jobs/{job_id}").json()
+                    if job["status"] in ("completed", "failed"):
+                        break
+                    time.sleep(0.1)
+            assert job.get("status") == "completed", job
+            assert job["result"]["blog_markdown"]
+        finally:
+            app.terminate()
+            app.wait(timeout=30)
+            fake.stop()
@@ -0,0 +1,105 @@
+"""
+Tests for the JSX syntax check and the React validator
+"""
+import pytest
+
+from app.jsx import JSXSyntaxError, find_syntax_error
+from app.validators import validate_react
+
+VALID = [
+    # Comparisons are operators, not tags
+    "const ok = a < b && b > c;",
+    "const show = x<3 && <div/>;",
+    "for (let i = 0; i<items.length; i++) { total += i; }",
+    "const big = count > 10 ? <b>many</b> : <i>few</i>;",
+    # Generic arrow functions in .tsx
+    "const first = <T,>(items: T[]) => items[0];",
+    "const pick = <K extends string>(key: K) => key;",
+    # Regex literals may contain anything that looks like a tag
+    r"const re = /<div>\/[a-z]+/g;",
+    r"const parts = text.split(/[<>{}]/);",
+    "return /<\\/?p>/.test(html);",
+    # Division after a value is not a regex
+    "const half = (a + b) / 2 / scale;",
+    # TypeScript assertions
+    'const COLORS = ["red", "blue"] as const;',
+    "const n = (value as number) < 3;",
+    # Template literals, nested ${} and braces inside them
+    "const label = `${count} item${count === 1 ? '' : 's'} <b>{}</b>`;",
+    "const css = `a { color: ${theme({ dark: `${base}` })}; }`;",
+    # JSX with expressions, fragments, spreads and comments
+    'const el = <><Card {...props} title="a > b" onClick={() => go(`/p/${id}`)}>{items.map((i) => <li key={i}>{i}</li>)}</Card></>;',
+    "const el = (\n  <div>\n    {/* a comment with <b> in it */}\n    text &amp; more\n  </div>\n);",
+]
+
+
+@pytest.mark.parametrize("code", VALID)
+def test_valid_code_has_no_syntax_error(code):
+    assert find_syntax_error(code) is None
+
+
+def _error(code: str) -> JSXSyntaxError:
+    error = find_syntax_error(code)
+    assert error is not None
+    return error
+
+
+def test_unclosed_tag():
+    error = _error("export default function A() {\n  return (\n    <div>\n      <p>text\n    </div>\n  );\n}\n")
+    assert "Expected </p>" in error.message
+    assert (error.line, error.column) == (5, 5)
+    assert str(error).startswith("Line 5, column 5: ")
+
+
+def test_mismatched_closing_tag():
+    error = _error("const el = <section><h2>Title</h3></section>;")
+    assert error.message.startswith("Expected </h2> to close <h2>")
+    assert "found </h3>" in error.message
+    assert (error.line, error.column) == (1, 30)
+
+
+def test_tag_never_closed():
+    error = _error("const el = (\n  <main>\n    <p>hi</p>\n);\n")
+    assert "<main> opened at 2:3 is never closed" in error.message
+
+
+def test_stray_brace_in_jsx_text():
+    error = _error("const el = <p>use a } here</p>;")
+    assert "Unexpected '}' in JSX text" in error.message
+    assert (error.line, error.column) == (1, 21)
+
+
+def test_unterminated_string_and_template():
+    assert _error('const s = "abc;\n').message == "Unterminated string"
+    assert _error("const s = `abc ${x}\n").message == "Unterminated template literal"
+
+
+def test_unbalanced_brackets():
+    error = _error("function f() {\n  if (a) {\n    go();\n}\n")
+    assert "'{' opened at 1:14 is never closed" in error.message
+    assert "Unexpected ')'" in _error("const a = [1, 2);").message
+
+
+COMPONENT = """const ACCENT_RED = "#dc2626";
+const BG_OFFWHITE = "#fffcf8";
+
+export default function BlogPost() {
+  return <main style={{ background: BG_OFFWHITE, color: ACCENT_RED }}>hello</main>;
+}
+"""
+
+
+def test_validate_react_accepts_component():
+    assert validate_react(COMPONENT) == (True, "")
+
+
+def test_validate_react_reports_problems():
+    assert validate_react("   ")[0] is False
+    ok, feedback = validate_react(COMPONENT.replace("export default ", ""))
+    assert not ok and "Export a default React component" in feedback
+    ok, feedback = validate_react(COMPONENT.replace('const ACCENT_RED = "#dc2626";\n', ""))
+    assert not ok and "Define the color constant: const ACCENT_RED" in feedback
+    ok, feedback = validate_react(COMPONENT.replace('"#fffcf8"', '"#ffffff"'))
+    assert not ok and feedback == 'Line 2: BG_OFFWHITE is "#ffffff" but must be "#fffcf8".'
+    ok, feedback = validate_react(COMPONENT.replace("hello</main>", "hello</div>"))
+    assert not ok and feedback.startswith("Syntax error: Line 5, column ")
@@ -0,0 +1,117 @@
+"""
+Tests for the search/replace patches used to repair generated React code
+"""
+import pytest
+
+from app.patches import PatchError, apply_hunks, excerpt, failing_lines, parse_hunks
+from app.validators import validate_react
+
+CODE = """import React from "react";
+
+const ACCENT_RED = "#dc2626";
+const BG_OFFWHITE = "#fffcf8";
+
+function Card({ title }) {
+  return <h2>{title}</h2>;
+}
+
+export default function BlogPost() {
+  return (
+    <main style={{ background: BG_OFFWHITE }}>
+      <Card title="one" />
+      <p style={{ color: ACCENT_RED }}>text</p>
+    </main>
+  );
+}
+"""
+
+
+def _patch(*hunks) -> str:
+    return "\n".join(f"<<<<<<< SEARCH\n{search}\n=======\n{replace}\n>>>>>>> REPLACE" for search, replace in hunks)
+
+
+def test_located_feedback_gives_its_lines():
+    feedback = "Syntax error: Line 13, column 7: Expected </p>\nLine 3: ACCENT_RED is \"#ff0000\" but must be \"#dc2626\"."
+    assert failing_lines(CODE, feedback) == {3, 13}
+    assert failing_lines(CODE, "Unexpected ')' at 14:3") == {14}
+
+
+def test_located_feedback_outside_the_code_is_dropped():
+    assert failing_lines(CODE, "Line 400: nothing here") == set()
+
+
+def test_unlocated_validator_problems_point_at_head_and_components():
+    _, feedback = validate_react(CODE.replace("export default ", ""))
+    lines = failing_lines(CODE, feedback)
+    assert set(range(1, 13)) <= lines
+    assert {6, 10} <= lines  # function Card, function BlogPost
+    _, feedback = validate_react(CODE.replace('const BG_OFFWHITE = "#fffcf8";\n', ""))
+    assert set(range(1, 13)) <= failing_lines(CODE, feedback)
+
+
+def test_free_form_feedback_gives_no_lines():
+    assert failing_lines(CODE, "make the title bigger") == set()
+    assert failing_lines(CODE, "Use a darker red for links.\nAdd more spacing.") == set()
+
+
+def test_excerpt_numbers_lines_and_marks_gaps():
+    assert excerpt(CODE, {3}, 1).splitlines() == [
+        "...",
+        "   2| ",
+        '   3| const ACCENT_RED = "#dc2626";',
+        '   4| const BG_OFFWHITE = "#fffcf8";',
+        "...",
+    ]
+    assert excerpt("a\nb", {1}, 5).splitlines() == ["   1| a", "   2| b"]
+
+
+def test_parse_hunks():
+    hunks = parse_hunks("Here is the fix:\n" + _patch(("  return <h2>{title}</h2>;", "  return <h3>{title}</h3>;")))
+    assert hunks == [("  return <h2>{title}</h2>;\n", "  return <h3>{title}</h3>;\n")]
+    with pytest.raises(PatchError):
+        parse_hunks("I could not find a problem.")
+
+
+def test_parse_hunks_strips_copied_line_numbers():
+    [(search, replace)] = parse_hunks(_patch(('   3| const ACCENT_RED = "#ff0000";', '   3| const ACCENT_RED = "#dc2626";')))
+    assert search == 'const ACCENT_RED = "#ff0000";\n'
+    assert replace == 'const ACCENT_RED = "#dc2626";\n'
+
+
+def test_apply_hunks_in_order():
+    hunks = parse_hunks(_patch(
+        ('      <Card title="one" />', '      <Card title="two" />'),
+        ('      <Card title="two" />', '      <Card title="three" />'),
+        ("  return <h2>{title}</h2>;", "  return <h3>{title}</h3>;"),
+    ))
+    patched = apply_hunks(CODE, hunks)
+    assert '<Card title="three" />' in patched
+    assert "<h3>{title}</h3>" in patched
+    assert patched.count("\n") == CODE.count("\n")
+    assert validate_react(patched) == (True, "")
+
+
+def test_apply_hunks_ignores_indentation():
+    [hunk] = parse_hunks(_patch(("<Card title=\"one\" />", "      <Card title=\"uno\" />")))
+    assert '      <Card title="uno" />\n      <p' in apply_hunks(CODE, [hunk])
+
+
+def test_apply_hunks_rejects_missing_and_ambiguous_search():
+    with pytest.raises(PatchError, match="not found"):
+        apply_hunks(CODE, [("  return <h4>{title}</h4>;\n", "")])
+    with pytest.raises(PatchError, match="matches 2 places"):
+        apply_hunks(CODE, [("return ", "yield ")])
+    # Ambiguous only once indentation is ignored
+    with pytest.raises(PatchError, match="matches several places"):
+        apply_hunks("  <li />\n    <li />\n", [("<li />  ", "<li key={1} />")])
+    with pytest.raises(PatchError, match="Empty SEARCH"):
+        apply_hunks(CODE, [("\n", "x")])
+
+
+def test_apply_hunks_keeps_crlf_line_endings():
+    code = CODE.replace("\n", "\r\n")
+    hunks = parse_hunks(_patch(("  return <h2>{title}</h2>;", "  return (\n    <h3>{title}</h3>\n  );")).replace("\n", "\r\n"))
+    patched = apply_hunks(code, hunks)
+    assert "\r\n    <h3>{title}</h3>\r\n  );\r\n" in patched
+    assert "\n" not in patched.replace("\r\n", "")
+    assert patched.replace("\r\n", "\n") == apply_hunks(CODE, hunks)
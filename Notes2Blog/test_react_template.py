@@ -0,0 +1,72 @@
+"""
+Tests for the template React renderer (REACT_MODE=template)
+"""
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+from app.jsx import find_syntax_error
+from app.modules.react_template import render_react
+from app.validators import validate_react
+
+ARTICLE = """# Braces {and} <Tags> & more
+
+## Section One
+Use {x} and a < b & c > d, then [bad](javascript:alert(1)) and [good](https://example.com/?a=1&b=2).
+
+```
+if (a < b) { return "}"; }
+```
+
+## Section One
+Inline `<div>{}</div>` & friends.
+
+## Section One
+Third & last.
+"""
+
+
+def _body(code: str) -> str:
+    return code.split("export default function BlogPost()")[1]
+
+
+def test_output_is_valid_react():
+    code = render_react(ARTICLE)
+    assert find_syntax_error(code) is None
+    assert validate_react(code) == (True, "")
+
+
+def test_title_is_a_string_expression():
+    code = render_react(ARTICLE)
+    assert '<ArticleTitle title={"Braces {and} <Tags> & more"} />' in code
+    assert 'title={"Fallback"}' in render_react("## Only\nText.\n", title="Fallback")
+
+
+def test_text_with_jsx_characters_is_escaped():
+    body = _body(render_react(ARTICLE))
+    assert '{"Use {x} and a < b & c > d, then [bad](javascript:alert(1)) and "}' in body
+    assert '<code>{"if (a < b) { return \\"}\\"; }"}</code>' in body
+    assert '{"<div>{}</div>"}' in body
+    # Text without braces or angle brackets stays plain, with & as an entity
+    assert "&amp; friends." in body
+    assert "Third &amp; last." in body
+
+
+def test_javascript_links_are_not_emitted():
+    body = _body(render_react(ARTICLE))
+    assert "javascript:" not in re.sub(r'\{"Use .*?"\}', "", body)
+    assert body.count("<a href=") == 1
+    assert '<a href={"https://example.com/?a=1&b=2"}' in body
+
+
+def test_duplicate_headings_get_unique_ids():
+    ids = re.findall(r'<section id="([^"]+)">', render_react(ARTICLE))
+    assert ids == ["section-one", "section-one-2", "section-one-3"]
+
+
+def test_template_does_not_import_dspy():
+    # A fresh interpreter, since other tests may have loaded DSPy already
+    check = "import sys, app.modules.react_template; print('dspy' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", check], cwd=Path(__file__).parent, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"